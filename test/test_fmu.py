@@ -1,23 +1,24 @@
 import json
 import os
+import pathlib
 import random
 import string
 
 from pyOSPParser.model_description import OspModelDescription, OspVariableGroupsType, \
     OspLinearMechanicalPortType, OspForceType, OspLinearVelocityType, OspVariableType
 
-from pycosim.simulation import FMU
-
-PATH_TO_FMU = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fmus', 'chassis.fmu')
-PATH_TO_FMU_DIR = os.path.dirname(PATH_TO_FMU)
+_FMUS_DIR = pathlib.Path(__file__).resolve().parent / 'fmus'
+PATH_TO_FMU = str(_FMUS_DIR / 'chassis.fmu')
+PATH_TO_FMU_DIR = str(_FMUS_DIR)
+_ALPHABET = string.ascii_lowercase
 
 
 def get_random_string(length: int = 5):
-    return ''.join(random.sample(string.ascii_lowercase, k=length))
+    return ''.join(random.choices(_ALPHABET, k=length))
 
 
-def test_fmu():
-    fmu = FMU(PATH_TO_FMU)
+def test_fmu(chassis_fmu, tmp_path):
+    fmu = chassis_fmu
 
     # Check if the fmu has correct reference, name and uuid
     assert os.path.isfile(fmu.fmu_file)
@@ -34,19 +35,18 @@ def test_fmu():
 
     # Test running a single FMU simulation
     finish_time = 10.0
-    output_file_path = os.path.join(os.path.dirname(fmu.fmu_file), 'output.csv')
+    output_file_path = os.path.join(str(tmp_path), 'output.csv')
     result, log = fmu.run_simulation(
         initial_values={fmu.inputs[0].get('name'): random.random() * 10},
         output_file_path=output_file_path,
         duration=finish_time,
     )
-    assert result['Time'].values[-1] == finish_time
+    assert result['Time'].to_numpy(copy=False)[-1] == finish_time
     assert os.path.isfile(output_file_path)
-    os.remove(output_file_path)
 
 
-def test_add_variable_group():
-    fmu = FMU(PATH_TO_FMU)
+def test_add_variable_group(chassis_fmu):
+    fmu = chassis_fmu
     fmu.osp_model_description = OspModelDescription(
         VariableGroups=OspVariableGroupsType()
     )
@@ -0,0 +1,66 @@
+"""Testing the post-processing kernels"""
+
+import numpy as np
+import pytest
+
+from pycosim import postproc
+from pycosim.postproc import rms, energy, count_crossings
+from pycosim.simulation import SimulationOutput
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+
+def test_rms():
+    values = np.array([1.0, 2.0, 3.0])
+    assert rms(values) == pytest.approx(np.sqrt((1.0 + 4.0 + 9.0) / 3.0))
+    assert rms(np.zeros(5)) == 0.0
+
+
+def test_energy():
+    values = np.array([0.0, 1.0, 2.0])
+    times = np.array([0.0, 1.0, 2.0])
+    # Trapezoids over the squared signal: 0.5 * ((1 + 0) + (4 + 1))
+    assert energy(values, times) == pytest.approx(3.0)
+    # A constant signal integrates to value^2 times the duration
+    assert energy(np.full(3, 2.0), times) == pytest.approx(8.0)
+
+
+def test_count_crossings():
+    values = np.array([0.0, 1.0, 0.2, 2.0, 0.5])
+    # Upward crossings of 0.5: 0 -> 1 and 0.2 -> 2
+    assert count_crossings(values, 0.5) == 2
+    # Reaching the threshold exactly counts as a crossing
+    assert count_crossings(np.array([0.0, 0.5]), 0.5) == 1
+    assert count_crossings(np.ones(5), 0.5) == 0
+
+
+def test_simulation_output_reduce():
+    output = SimulationOutput(
+        result={
+            'chassis': pandas.DataFrame({
+                'Time': [0.0, 1.0, 2.0],
+                'zChassis': [1.0, 2.0, 3.0],
+            }),
+            'wheel': pandas.DataFrame({'zWheel': [0.0, 1.0, 0.0]}),
+        },
+        log='',
+        error='',
+        output_file_path=''
+    )
+    reduced = output.reduce(rms, {'chassis': ['zChassis'], 'wheel': ['zWheel']})
+    assert reduced['chassis']['zChassis'] == pytest.approx(np.sqrt(14.0 / 3.0))
+    assert reduced['wheel']['zWheel'] == pytest.approx(np.sqrt(1.0 / 3.0))
+
+
+def test_jit_fallback_without_numba(monkeypatch):
+    """The kernels run as plain numpy functions when numba is not installed"""
+    monkeypatch.setattr(postproc, '_njit', None)
+
+    def kernel(values):
+        return values.sum()
+
+    assert postproc._jit(kernel) is kernel
+    assert postproc._jit(kernel)(np.array([1.0, 2.0])) == 3.0
